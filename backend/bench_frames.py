@@ -0,0 +1,80 @@
+import argparse
+import base64
+import io
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from PIL import Image
+from frame_store import FrameStore
+
+# --- FRAME INGEST BENCHMARK ---
+# Frames/sec of one handler worker, legacy base64 path vs binary + write-behind.
+# Usage: python bench_frames.py --frames 300 --width 1280 --height 720
+
+
+def sample_jpeg(width, height, quality=70):
+    rng = np.random.default_rng(0)
+    gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+    noise = rng.integers(0, 40, (height, width, 3), dtype=np.uint8)
+    pixels = np.clip(gradient + noise, 0, 255).astype(np.uint8)
+    out = io.BytesIO()
+    Image.fromarray(pixels).save(out, 'JPEG', quality=quality)
+    return out.getvalue()
+
+
+def legacy_frame(session_path, data_url, index):
+    """What handle_frame used to do per frame."""
+    header, encoded = data_url.split(",", 1)
+    file_data = base64.b64decode(encoded)
+    with open(os.path.join(session_path, f"{index}.jpg"), "wb") as f:
+        f.write(file_data)
+    count = len(os.listdir(session_path))
+    return {'image': data_url, 'count': count}
+
+
+def binary_frame(store, room, jpeg_bytes):
+    """What ingest_frame does per frame (the write happens on the pool)."""
+    meta = store.ingest(room, jpeg_bytes)
+    return {'thumbnail': f"/thumbs/{room}/{meta['filename']}", **meta}
+
+
+def run(frames, width, height):
+    jpeg = sample_jpeg(width, height)
+    data_url = "data:image/jpeg;base64," + base64.b64encode(jpeg).decode('ascii')
+    root = tempfile.mkdtemp(prefix="frame-bench-")
+    try:
+        legacy_path = os.path.join(root, 'legacy')
+        os.makedirs(legacy_path)
+        start = time.perf_counter()
+        for i in range(frames):
+            legacy_out = legacy_frame(legacy_path, data_url, i)
+        legacy_fps = frames / (time.perf_counter() - start)
+
+        store = FrameStore(root)
+        start = time.perf_counter()
+        for _ in range(frames):
+            binary_out = binary_frame(store, 'binary', jpeg)
+        handler_fps = frames / (time.perf_counter() - start)
+        store.flush('binary')
+        thumb = open(store.thumbnail_path('binary', binary_out['filename']), 'rb').read()
+        durable_fps = frames / (time.perf_counter() - start)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+    print(f"Frame: {width}x{height} JPEG, {len(jpeg) / 1024:.1f} KB")
+    print(f"  inbound wire bytes   legacy {len(data_url):>9}   binary {len(jpeg):>9}")
+    print(f"  outbound wire bytes  legacy {len(str(legacy_out)):>9}   binary {len(str(binary_out)):>9}"
+          f"  (+{len(thumb)} thumbnail, built on request)")
+    print(f"  legacy handler       {legacy_fps:8.1f} frames/s")
+    print(f"  binary handler       {handler_fps:8.1f} frames/s  ({durable_fps:.1f} frames/s incl. flush)")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    args = parser.parse_args()
+    run(args.frames, args.width, args.height)
@@ -0,0 +1,87 @@
+import argparse
+import logging
+import shutil
+import tempfile
+import threading
+import time
+import numpy as np
+from werkzeug.serving import make_server
+from fake_geo import create_app
+import geo_engine
+from geo_engine import TileCache, geo_request, fetch_source, model_glb
+from meshy_client import make_session
+
+# --- GEOSCULPTOR CACHE BENCHMARK ---
+# Runs GeoSculptor requests against the local fake tile/Overpass server, first
+# on an empty cache (cold: download + decode + mesh) and then warm (cache
+# reopened from disk, arrays memory-mapped). It prints a timing per stage for each case.
+# Usage: python bench_geo.py --radius 0.2 0.5 1.0 --latency 0.3 --repeats 5
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def run_case(params, cache_dir, session, repeats):
+    """(cold fetch, cold mesh, warm fetch median, warm mesh median, glb bytes, info)."""
+    (source, cached), cold_fetch = timed(fetch_source, params, TileCache(cache_dir), session)
+    assert not cached
+    (payload, info), cold_mesh = timed(model_glb, params, source)
+
+    warm_fetch, warm_mesh = [], []
+    for _ in range(repeats):
+        cache = TileCache(cache_dir)  # Fresh index each time, as after a restart
+        (source, cached), seconds = timed(fetch_source, params, cache, session)
+        assert cached
+        warm_fetch.append(seconds)
+        (warm_payload, _), seconds = timed(model_glb, params, source)
+        warm_mesh.append(seconds)
+        assert warm_payload == payload, "Warm output differs from cold"
+    return cold_fetch, cold_mesh, np.median(warm_fetch), np.median(warm_mesh), len(payload), info
+
+
+def run(radii, terrain, latency, spacing, repeats, port):
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', port, create_app(latency, spacing), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{port}"
+
+    geo_engine.MAPBOX_API_URL = base_url
+    geo_engine.OVERPASS_URL = f"{base_url}/api/interpreter"
+    geo_engine.MAPBOX_TOKEN = 'bench'
+    session = make_session()
+    cache_dir = tempfile.mkdtemp(prefix="geo-bench-")
+
+    cases = [geo_request({'lat': 48.1374, 'lon': 11.5755, 'radius': r}) for r in radii]
+    if terrain:
+        cases.append(geo_request({'lat': 46.5586, 'lon': 7.8393, 'mode': 'terrain'}))
+
+    print(f"Upstream latency {latency}s, building spacing {spacing}m, {repeats} warm repeats")
+    print(f"{'case':<16}{'cold fetch':>11}{'cold mesh':>11}{'warm fetch':>12}{'warm mesh':>11}"
+          f"{'speedup':>9}{'GLB':>10}{'triangles':>11}")
+    try:
+        for params in cases:
+            cold_fetch, cold_mesh, warm_fetch, warm_mesh, size, info = run_case(params, cache_dir, session, repeats)
+            label = f"terrain z{params['zoom']}" if params['mode'] == 'terrain' else \
+                f"city {params['radius']}km/{info['buildings']}"
+            speedup = (cold_fetch + cold_mesh) / (warm_fetch + warm_mesh)
+            print(f"{label:<16}{cold_fetch * 1000:9.1f}ms{cold_mesh * 1000:9.1f}ms{warm_fetch * 1000:10.2f}ms"
+                  f"{warm_mesh * 1000:9.1f}ms{speedup:8.1f}x{size / 1024:8.0f}KB{info['triangles']:>11}")
+        print(f"Cache: {TileCache(cache_dir).stats()['bytes'] / 1024:.0f}KB on disk")
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Cold vs warm cache timings for the GeoSculptor endpoint")
+    parser.add_argument('--radius', type=float, nargs='+', default=[0.2, 0.5, 1.0], help="City radii in km")
+    parser.add_argument('--no-terrain', action='store_true')
+    parser.add_argument('--latency', type=float, default=0.3, help="Fake upstream latency in seconds")
+    parser.add_argument('--spacing', type=float, default=25.0, help="Metres between fake buildings")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--port', type=int, default=5056)
+    args = parser.parse_args()
+    run(args.radius, not args.no_terrain, args.latency, args.spacing, args.repeats, args.port)
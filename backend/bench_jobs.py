@@ -0,0 +1,81 @@
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+import numpy as np
+from werkzeug.serving import make_server
+from fake_meshy import create_app
+from jobs import JobScheduler, QueueFull
+from meshy_client import generate_mesh_with_api, make_session, poll_delays
+
+# --- RECONSTRUCTION LOAD TEST ---
+# Drives the job scheduler against the local fake Meshy server and reports
+# throughput and end-to-end (submit -> finished) latency percentiles.
+# Usage: python bench_jobs.py --jobs 40 --rooms 20 --workers 4 --latency 1.0
+
+
+def run(jobs, rooms, workers, latency, jitter, failure, port):
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', port, create_app(latency, jitter, failure, seed=0), threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{port}"
+
+    session = make_session(pool_size=workers)
+    out_dir = tempfile.mkdtemp(prefix="job-bench-")
+    done = threading.Event()
+    finished = []
+    lock = threading.Lock()
+
+    def on_update(job):
+        if job.finished_at:
+            with lock:
+                finished.append(job)
+                if len(finished) == jobs:
+                    done.set()
+
+    def reconstruct(job, index):
+        return generate_mesh_with_api(
+            [f"{base_url}/img/{index}.jpg"], os.path.join(out_dir, f"{job.id}.glb"),
+            progress=job.report, cancel_event=job.cancel_event, session=session,
+            api_key='bench', base_url=base_url,
+            delays=poll_delays(initial=0.1, maximum=latency, deadline=latency * 20),
+        )
+
+    scheduler = JobScheduler(workers=workers, max_queue=jobs, on_update=on_update)
+    start = time.perf_counter()
+    try:
+        for i in range(jobs):
+            scheduler.submit(f"room-{i % rooms}", reconstruct, i)
+    except QueueFull as e:
+        print(f"Queue full: {e}")
+    done.wait(timeout=latency * 40 + 30)
+    wall = time.perf_counter() - start
+
+    server.shutdown()
+    shutil.rmtree(out_dir, ignore_errors=True)
+
+    latencies = np.array([j.finished_at - j.created_at for j in finished])
+    results = Counter(j.result for j in finished)
+    print(f"Jobs: {len(finished)}/{jobs} over {rooms} rooms, {workers} workers, fake latency {latency}s ({failure})")
+    print(f"  throughput   {len(finished) / wall:6.2f} jobs/s  (wall {wall:.1f}s)")
+    if len(latencies):
+        print(f"  latency p50  {np.percentile(latencies, 50):6.2f}s")
+        print(f"  latency p99  {np.percentile(latencies, 99):6.2f}s")
+    print(f"  results      {dict(results)}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load-test reconstructions against the fake Meshy server")
+    parser.add_argument('--jobs', type=int, default=40)
+    parser.add_argument('--rooms', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--latency', type=float, default=1.0)
+    parser.add_argument('--jitter', type=float, default=0.3)
+    parser.add_argument('--failure', default='none')
+    parser.add_argument('--port', type=int, default=5056)
+    args = parser.parse_args()
+    run(args.jobs, args.rooms, args.workers, args.latency, args.jitter, args.failure, args.port)
@@ -0,0 +1,183 @@
+import argparse
+import base64
+import threading
+import time
+import uuid
+import numpy as np
+import requests
+import socketio
+from bench_frames import sample_jpeg
+
+# --- SOCKET.IO LOAD GENERATOR ---
+# Simulates phones (sensors) streaming frames into rooms while desktops watch,
+# against a running backend. Reports throughput, ack latency (sensor emit ->
+# handler finished) and delivery latency (sensor emit -> desktop receives
+# frame_received), then the server's own handler percentiles from /metrics.
+# Usage: python bench_socket.py --url http://127.0.0.1:5001 --rooms 10 --rate 5 --duration 20
+
+
+class RoomLoad:
+    def __init__(self, room_id):
+        self.id = room_id
+        self.sent_at = []  # Send time of the n-th frame; frame_received 'count' n maps to index n - 1
+        self.lock = threading.Lock()
+
+
+class Recorder:
+    def __init__(self):
+        self.acks = []
+        self.deliveries = []
+        self.sent = 0
+        self.sent_bytes = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def add(self, field, value):
+        with self.lock:
+            getattr(self, field).append(value)
+
+    def count(self, field, amount=1):
+        with self.lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+
+def connect(url, transport):
+    client = socketio.Client(reconnection=False)
+    client.connect(url, transports=[transport], wait_timeout=10)
+    return client
+
+
+def run_desktop(url, transport, room, recorder, ready, done):
+    try:
+        client = connect(url, transport)
+    except Exception as e:
+        print(f"⚠️ Desktop connect failed: {e}")
+        recorder.count('errors')
+        ready.release()
+        return
+
+    @client.on('frame_received')
+    def on_frame(data):
+        now = time.perf_counter()
+        with room.lock:
+            index = data.get('count', 0) - 1
+            sent = room.sent_at[index] if 0 <= index < len(room.sent_at) else None
+        if sent is not None:
+            recorder.add('deliveries', now - sent)
+
+    client.emit('join_session', {'sessionId': room.id, 'type': 'desktop'})
+    ready.release()
+    done.wait()
+    client.disconnect()
+
+
+def run_sensor(url, transport, room, recorder, payload, event, rate, start, deadline):
+    try:
+        client = connect(url, transport)
+    except Exception as e:
+        print(f"⚠️ Sensor connect failed: {e}")
+        recorder.count('errors')
+        return
+    client.emit('join_session', {'sessionId': room.id, 'type': 'sensor'})
+
+    interval = 1.0 / rate
+    next_send = start
+    while True:
+        next_send += interval
+        delay = next_send - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        if time.perf_counter() >= deadline:
+            break
+        sent = time.perf_counter()
+        with room.lock:
+            room.sent_at.append(sent)
+        try:
+            client.emit(event, {'roomId': room.id, 'image': payload},
+                        callback=lambda *args, sent=sent: recorder.add('acks', time.perf_counter() - sent))
+        except Exception:
+            recorder.count('errors')
+            continue
+        recorder.count('sent')
+        recorder.count('sent_bytes', len(payload))
+
+    time.sleep(1.0)  # Let the last acks and deliveries arrive
+    client.disconnect()
+
+
+def percentiles_ms(samples):
+    if not samples:
+        return "n/a"
+    p50, p99 = np.percentile(np.array(samples) * 1000, [50, 99])
+    return f"p50 {p50:7.1f}ms  p99 {p99:7.1f}ms"
+
+
+def run(url, rooms, sensors, desktops, rate, duration, width, height, legacy, transport):
+    jpeg = sample_jpeg(width, height)
+    if legacy:
+        payload, event = "data:image/jpeg;base64," + base64.b64encode(jpeg).decode('ascii'), 'send_frame'
+    else:
+        payload, event = jpeg, 'send_frame_binary'
+
+    recorder = Recorder()
+    loads = [RoomLoad(f"bench-{uuid.uuid4().hex[:8]}") for _ in range(rooms)]
+    ready = threading.Semaphore(0)
+    done = threading.Event()
+
+    watchers = [threading.Thread(target=run_desktop, args=(url, transport, room, recorder, ready, done), daemon=True)
+                for room in loads for _ in range(desktops)]
+    for t in watchers:
+        t.start()
+    for _ in watchers:
+        ready.acquire()  # Every desktop is listening before the first frame goes out
+
+    start = time.perf_counter()
+    deadline = start + duration
+    senders = [threading.Thread(target=run_sensor,
+                                args=(url, transport, room, recorder, payload, event, rate, start, deadline),
+                                daemon=True)
+               for room in loads for _ in range(sensors)]
+    for t in senders:
+        t.start()
+    for t in senders:
+        t.join()
+    done.set()
+    for t in watchers:
+        t.join(timeout=5)
+
+    expected = recorder.sent * desktops
+    print(f"Load: {rooms} rooms x ({sensors} sensor + {desktops} desktop), {rate} fps/sensor, "
+          f"{len(jpeg) / 1024:.0f}KB frames via {event} ({transport}), {duration}s")
+    print(f"  sent         {recorder.sent} frames, {recorder.sent_bytes / 1e6:.1f}MB, {recorder.errors} errors")
+    print(f"  throughput   {len(recorder.acks) / duration:7.1f} frames/s acked, "
+          f"{recorder.sent_bytes / duration / 1e6:6.2f}MB/s offered")
+    print(f"  ack          {percentiles_ms(recorder.acks)}  ({len(recorder.acks)}/{recorder.sent})")
+    print(f"  delivery     {percentiles_ms(recorder.deliveries)}  ({len(recorder.deliveries)}/{expected})")
+
+    try:
+        text = requests.get(f"{url}/metrics", timeout=5).text
+    except requests.RequestException as e:
+        print(f"  (no /metrics: {e})")
+        return
+    print("Server /metrics:")
+    for line in text.splitlines():
+        if line.startswith(('# socket_handler_seconds', '# frame_stage_seconds', 'frames_total', 'active_rooms',
+                            'socket_handler_errors_total', 'frame_errors_total')):
+            print(f"  {line.lstrip('# ')}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Socket.IO load generator for the frame pipeline")
+    parser.add_argument('--url', default='http://127.0.0.1:5001')
+    parser.add_argument('--rooms', type=int, default=10)
+    parser.add_argument('--sensors', type=int, default=1, help="Sensors per room")
+    parser.add_argument('--desktops', type=int, default=1, help="Desktops per room")
+    parser.add_argument('--rate', type=float, default=5.0, help="Frames per second per sensor")
+    parser.add_argument('--duration', type=float, default=20.0)
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    parser.add_argument('--legacy', action='store_true', help="Send base64 data URLs on send_frame")
+    parser.add_argument('--transport', default='websocket', choices=['websocket', 'polling'])
+    args = parser.parse_args()
+    run(args.url, args.rooms, args.sensors, args.desktops, args.rate, args.duration,
+        args.width, args.height, args.legacy, args.transport)
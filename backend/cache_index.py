@@ -0,0 +1,84 @@
+import os
+import threading
+from collections import OrderedDict
+
+# --- CACHE INDEX (LRU Byte Budget) ---
+# In-memory bookkeeping shared by the on-disk caches (ResultCache, TileCache):
+# entry sizes in least-recently-used order, the byte total and hit/miss/eviction
+# counters. It only decides; the caches own the files and delete the victims
+# it hands back.
+
+
+def dir_size(path):
+    """Bytes under path, recursively; files that vanish mid-walk count as 0."""
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+class CacheIndex:
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self._entries = OrderedDict()  # key -> size, oldest use first
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = 0
+
+    def load(self, found):
+        """Seeds the order from (last_use, key, size) tuples, e.g. mtimes found on disk."""
+        with self._lock:
+            for _, key, size in sorted(found):
+                self._bytes += size - self._entries.pop(key, 0)
+                self._entries[key] = size
+
+    def hit(self, key):
+        """True (and marks it recently used) if key is indexed; counts the hit or miss."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return False
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True
+
+    def discard(self, key):
+        """Forgets an entry whose files turned out to be gone."""
+        with self._lock:
+            self._bytes -= self._entries.pop(key, 0)
+
+    def add(self, key, size):
+        """Records key as newest at its measured size. Returns the keys to delete."""
+        with self._lock:
+            self._bytes += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            return self._evict_locked(keep=key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'budgetBytes': self.budget_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+            }
+
+    def _evict_locked(self, keep=None):
+        victims = []
+        while self._bytes > self.budget_bytes and self._entries:
+            key = next(iter(self._entries))
+            if key == keep:
+                if len(self._entries) == 1:
+                    break  # A single entry larger than the budget still gets served once
+                self._entries.move_to_end(key)
+                continue
+            self._bytes -= self._entries.pop(key)
+            self.evictions += 1
+            victims.append(key)
+        return victims
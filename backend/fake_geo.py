@@ -0,0 +1,123 @@
+import io
+import re
+import zlib
+import argparse
+import threading
+import time
+import numpy as np
+from PIL import Image
+from flask import Flask, jsonify, request, Response
+
+# --- FAKE GEO SERVER ---
+# Local stand-in for Mapbox terrain-RGB tiles and the Overpass API so the
+# GeoSculptor endpoint can be tested and benchmarked offline. Point the backend
+# at it with MAPBOX_API_URL=http://localhost:5056 and
+# OVERPASS_URL=http://localhost:5056/api/interpreter.
+# Both answers are deterministic: the tile is seeded by z/x/y, the city by the
+# bbox in the query, so repeated requests return identical bytes.
+
+BBOX = re.compile(r'\(([-\d.]+),([-\d.]+),([-\d.]+),([-\d.]+)\)')
+
+
+def terrain_tile(zoom, x, y, size=256):
+    """Synthetic hills as terrain-RGB PNG bytes."""
+    rng = np.random.default_rng(zlib.crc32(f"{zoom}/{x}/{y}".encode()))
+    v, u = np.mgrid[0:1:size * 1j, 0:1:size * 1j]
+    heights = 400.0 + 30.0 * np.sin(6 * u + rng.uniform(0, 6)) * np.cos(5 * v)
+    for cx, cy, amp, width in rng.uniform([0, 0, 100, 0.05], [1, 1, 900, 0.3], size=(6, 4)):
+        heights += amp * np.exp(-((u - cx) ** 2 + (v - cy) ** 2) / (2 * width ** 2))
+    code = np.round((heights + 10000.0) * 10).astype(np.uint32)
+    rgb = np.stack([(code >> 16) & 255, (code >> 8) & 255, code & 255], axis=-1).astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(rgb, 'RGB').save(buf, format='PNG')
+    return buf.getvalue()
+
+
+def _footprint(rng, cx, cy, w, h):
+    """Rectangle, L or U footprint in metres around (cx, cy), randomly rotated."""
+    shape = rng.choice(['rect', 'rect', 'L', 'U'])
+    if shape == 'rect':
+        pts = [(0, 0), (1, 0), (1, 1), (0, 1)]
+    elif shape == 'L':
+        pts = [(0, 0), (1, 0), (1, 0.4), (0.4, 0.4), (0.4, 1), (0, 1)]
+    else:
+        pts = [(0, 0), (1, 0), (1, 1), (0.7, 1), (0.7, 0.35), (0.3, 0.35), (0.3, 1), (0, 1)]
+    pts = (np.array(pts) - 0.5) * [w, h]
+    angle = rng.uniform(0, np.pi / 2)
+    rot = np.array([[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]])
+    pts = pts @ rot.T + [cx, cy]
+    return pts[::-1] if rng.random() < 0.5 else pts  # OSM has both windings
+
+
+def overpass_city(south, west, north, east, spacing=25.0):
+    """Overpass 'out geom' JSON with a grid of building ways covering the bbox."""
+    rng = np.random.default_rng(zlib.crc32(f"{south:.6f},{west:.6f}".encode()))
+    lat0 = (south + north) / 2
+    m_per_lat = 111320.0
+    m_per_lon = 111320.0 * np.cos(np.radians(lat0))
+    width_m = (east - west) * m_per_lon
+    height_m = (north - south) * m_per_lat
+
+    elements = []
+    for gy in np.arange(spacing / 2, height_m, spacing):
+        for gx in np.arange(spacing / 2, width_m, spacing):
+            if rng.random() < 0.15:
+                continue  # Streets and squares
+            pts = _footprint(rng, gx, gy, *rng.uniform(8, spacing - 4, size=2))
+            pts = np.vstack([pts, pts[:1]])
+            tags = {'building': 'yes'}
+            pick = rng.random()
+            if pick < 0.4:
+                tags['height'] = f"{rng.uniform(6, 60):.1f}"
+            elif pick < 0.8:
+                tags['building:levels'] = str(rng.integers(1, 12))
+            if rng.random() < 0.05:
+                tags['min_height'] = '4'
+            elements.append({
+                'type': 'way', 'id': len(elements) + 1, 'tags': tags,
+                'geometry': [{'lat': south + py / m_per_lat, 'lon': west + px / m_per_lon} for px, py in pts],
+            })
+    return {'version': 0.6, 'generator': 'fake_geo', 'elements': elements}
+
+
+def create_app(latency=0.0, spacing=25.0):
+    app = Flask(__name__)
+    lock = threading.Lock()
+    stats = {'tiles': 0, 'queries': 0}
+
+    @app.route('/v4/mapbox.terrain-rgb/<int:zoom>/<int:x>/<int:y>.pngraw')
+    def tile(zoom, x, y):
+        if not request.args.get('access_token'):
+            return jsonify({'message': 'Not Authorized - No Token'}), 401
+        time.sleep(latency)
+        with lock:
+            stats['tiles'] += 1
+        return Response(terrain_tile(zoom, x, y), mimetype='image/png')
+
+    @app.route('/api/interpreter', methods=['GET', 'POST'])
+    def interpreter():
+        match = BBOX.search(request.values.get('data', ''))
+        if not match:
+            return jsonify({'remark': 'No bbox in query'}), 400
+        time.sleep(latency)
+        with lock:
+            stats['queries'] += 1
+        return jsonify(overpass_city(*map(float, match.groups()), spacing=spacing))
+
+    @app.route('/stats')
+    def geo_stats():
+        with lock:
+            return jsonify(stats)
+
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local fake of Mapbox terrain-RGB and Overpass")
+    parser.add_argument('--port', type=int, default=5056)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every upstream answer")
+    parser.add_argument('--spacing', type=float, default=25.0, help="Metres between fake buildings")
+    args = parser.parse_args()
+
+    print(f"🧪 Fake geo on port {args.port} (latency {args.latency}s, building spacing {args.spacing}m)")
+    create_app(args.latency, args.spacing).run(host='0.0.0.0', port=args.port, threaded=True)
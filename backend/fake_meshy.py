@@ -0,0 +1,111 @@
+import argparse
+import random
+import threading
+import time
+import uuid
+import numpy as np
+from flask import Flask, jsonify, request, Response
+from mesh_export import to_glb_bytes
+
+# --- FAKE MESHY SERVER ---
+# Local stand-in for the image-to-3d API so reconstructions can be load-tested
+# offline. Point the backend at it with MESHY_API_URL=http://localhost:5055
+# (any MESHY_API_KEY works unless --failure bad_key).
+#
+# Failure modes:
+#   none               every task succeeds after ~latency seconds
+#   no_credits         task creation returns 402
+#   bad_key            task creation returns 401
+#   generation_failed  tasks end in status FAILED
+#   never_finish       tasks stay IN_PROGRESS forever (client hits its deadline)
+#   flaky              --failure-rate of requests answer 503
+
+CUBE_VERTICES = np.array([[x, y, z] for x in (0, 1) for y in (0, 1) for z in (0, 1)], dtype=np.float32)
+CUBE_FACES = np.array([
+    [0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1],
+    [2, 3, 7], [2, 7, 6], [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3],
+])
+
+
+def create_app(latency=5.0, jitter=0.5, failure='none', failure_rate=0.1, seed=None):
+    app = Flask(__name__)
+    rng = random.Random(seed)
+    tasks = {}
+    lock = threading.Lock()
+    model = to_glb_bytes(CUBE_VERTICES, CUBE_FACES)
+    stats = {'created': 0, 'polls': 0, 'downloads': 0, 'rejected': 0}
+
+    def flaky():
+        if failure == 'flaky' and rng.random() < failure_rate:
+            with lock:
+                stats['rejected'] += 1
+            return jsonify({'message': 'Service Unavailable'}), 503
+        return None
+
+    @app.route('/v1/image-to-3d', methods=['POST'])
+    def create_task():
+        if failure == 'bad_key' or not request.headers.get('Authorization', '').startswith('Bearer '):
+            return jsonify({'message': 'Unauthorized'}), 401
+        if failure == 'no_credits':
+            return jsonify({'message': 'Payment Required'}), 402
+        rejected = flaky()
+        if rejected:
+            return rejected
+
+        task_id = uuid.uuid4().hex
+        duration = max(0.0, rng.lognormvariate(0, jitter) * latency) if jitter else latency
+        with lock:
+            tasks[task_id] = {'start': time.time(), 'duration': duration,
+                              'images': len((request.get_json(silent=True) or {}).get('image_urls', []))}
+            stats['created'] += 1
+        return jsonify({'result': task_id}), 202
+
+    @app.route('/v1/image-to-3d/<task_id>')
+    def task_status(task_id):
+        rejected = flaky()
+        if rejected:
+            return rejected
+        with lock:
+            task = tasks.get(task_id)
+            stats['polls'] += 1
+        if task is None:
+            return jsonify({'message': 'Not Found'}), 404
+
+        elapsed = time.time() - task['start']
+        if failure == 'never_finish' or elapsed < task['duration']:
+            pct = 99 if failure == 'never_finish' else int(100 * elapsed / task['duration'])
+            return jsonify({'id': task_id, 'status': 'IN_PROGRESS', 'progress': pct})
+        if failure == 'generation_failed':
+            return jsonify({'id': task_id, 'status': 'FAILED', 'task_error': {'message': 'Fake failure'}})
+        return jsonify({
+            'id': task_id, 'status': 'SUCCEEDED', 'progress': 100,
+            'model_urls': {'glb': f"{request.host_url}models/{task_id}.glb"},
+        })
+
+    @app.route('/models/<task_id>.glb')
+    def task_model(task_id):
+        with lock:
+            stats['downloads'] += 1
+        return Response(model, mimetype='model/gltf-binary')
+
+    @app.route('/stats')
+    def task_stats():
+        with lock:
+            return jsonify(dict(stats, tasks=len(tasks)))
+
+    return app
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Local fake of the Meshy image-to-3d API")
+    parser.add_argument('--port', type=int, default=5055)
+    parser.add_argument('--latency', type=float, default=5.0, help="Median seconds until a task succeeds")
+    parser.add_argument('--jitter', type=float, default=0.5, help="Log-normal sigma of the task duration")
+    parser.add_argument('--failure', default='none',
+                        choices=['none', 'no_credits', 'bad_key', 'generation_failed', 'never_finish', 'flaky'])
+    parser.add_argument('--failure-rate', type=float, default=0.1, help="503 probability in flaky mode")
+    args = parser.parse_args()
+
+    print(f"🧪 Fake Meshy on port {args.port} (latency {args.latency}s, failure: {args.failure})")
+    create_app(args.latency, args.jitter, args.failure, args.failure_rate).run(
+        host='0.0.0.0', port=args.port, threaded=True)
@@ -0,0 +1,174 @@
+import io
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image
+from metrics import metrics
+
+# --- FRAME STORE (Ingest + Write-Behind) ---
+# Keeps an in-memory index per room so the socket handlers never have to list
+# the session folder, and queues the disk writes on a small bounded pool of
+# writers. Under eventlet those writers are green threads, so the blocking
+# file I/O itself goes through `offload` (the app passes tpool.execute).
+# Desktop previews are built lazily: the viewer only shows the latest frame,
+# so most frames never need one.
+
+THUMB_FOLDER = 'thumbs'
+THUMB_SIZE = (160, 160)
+THUMB_QUALITY = 60
+WRITE_WORKERS = int(os.environ.get("FRAME_WRITE_WORKERS", 4))
+MAX_PENDING_WRITES = int(os.environ.get("FRAME_MAX_PENDING", 64))
+
+
+class RoomFrames:
+    """Per-room frame index: filenames, capture timestamps (ms) and byte sizes."""
+
+    def __init__(self):
+        self.filenames = []
+        self.timestamps = []
+        self.sizes = []
+        self.pending = set()
+
+    @property
+    def count(self):
+        return len(self.filenames)
+
+
+class FrameStore:
+    def __init__(self, root, workers=WRITE_WORKERS, max_pending=MAX_PENDING_WRITES, on_saved=None, offload=None):
+        self.root = root
+        self._on_saved = on_saved
+        self._offload = offload or (lambda fn, *args: fn(*args))  # Blocking disk work goes here
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="frame-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._rooms = {}
+        self._lock = threading.Lock()
+
+    def room(self, room_id, create=True):
+        """
+        Index for a room, seeded from disk once (e.g. after a restart).
+        With create=False, unknown rooms without a session folder give None.
+        """
+        if room_id in ('', '.', '..') or os.sep in room_id:
+            raise ValueError(f"Invalid room id: {room_id!r}")
+        with self._lock:
+            frames = self._rooms.get(room_id)
+            if frames is None:
+                session_path = os.path.join(self.root, room_id)
+                if not create and not os.path.isdir(session_path):
+                    return None
+                frames = RoomFrames()
+                if os.path.isdir(session_path):
+                    for name in sorted(f for f in os.listdir(session_path) if f.endswith('.jpg')):
+                        stem = name[:-len('.jpg')]
+                        frames.filenames.append(name)
+                        frames.timestamps.append(int(stem) if stem.isdigit() else 0)
+                        frames.sizes.append(os.path.getsize(os.path.join(session_path, name)))
+                self._rooms[room_id] = frames
+            return frames
+
+    def ingest(self, room_id, jpeg_bytes):
+        """Indexes the frame immediately and queues the disk write. Returns its metadata."""
+        frames = self.room(room_id)
+        with self._lock:
+            timestamp = int(time.time() * 1000)
+            if frames.timestamps and timestamp <= frames.timestamps[-1]:
+                timestamp = frames.timestamps[-1] + 1  # Keep filenames unique and ordered
+            filename = f"{timestamp}.jpg"
+            frames.filenames.append(filename)
+            frames.timestamps.append(timestamp)
+            frames.sizes.append(len(jpeg_bytes))
+            count = frames.count
+
+        # Backpressure: block the producer once too many writes are in flight
+        self._slots.acquire()
+        future = self._pool.submit(self._write, room_id, filename, jpeg_bytes)
+        with self._lock:
+            frames.pending.add(future)
+        future.add_done_callback(lambda f: self._finish(frames, f))
+
+        return {'filename': filename, 'timestamp': timestamp, 'size': len(jpeg_bytes), 'count': count}
+
+    def flush(self, room_id, timeout=None):
+        """Waits until every queued write for the room has hit the disk."""
+        frames = self.room(room_id, create=False)
+        if frames is None:
+            return
+        with self._lock:
+            pending = list(frames.pending)
+        for future in pending:
+            future.result(timeout=timeout)
+
+    def filenames(self, room_id):
+        frames = self.room(room_id, create=False)
+        if frames is None:
+            return []
+        with self._lock:
+            return list(frames.filenames)
+
+    def thumbnail_path(self, room_id, filename):
+        """Path of an indexed frame's preview, built on first request. None for anything else."""
+        try:
+            frames = self.room(room_id, create=False)
+        except ValueError:
+            return None
+        if frames is None:
+            return None
+        with self._lock:
+            if filename not in frames.filenames:
+                return None
+
+        session_path = os.path.join(self.root, room_id)
+        thumb_path = os.path.join(session_path, THUMB_FOLDER, filename)
+        if not os.path.exists(thumb_path):
+            self.flush(room_id)
+            try:
+                self._offload(_write_thumbnail, os.path.join(session_path, filename), thumb_path)
+            except OSError as e:  # Missing or undecodable frame (UnidentifiedImageError is an OSError)
+                print(f"⚠️ Thumbnail Error: {e}")
+                return None
+        return thumb_path
+
+    def forget(self, room_id):
+        """Drops the index for a room whose folder has been deleted."""
+        with self._lock:
+            self._rooms.pop(room_id, None)
+
+    def _write(self, room_id, filename, jpeg_bytes):
+        session_path = os.path.join(self.root, room_id)
+        with metrics.timer('frame_stage_seconds', stage='write'):
+            self._offload(_atomic_write, os.path.join(session_path, filename), jpeg_bytes)
+        if self._on_saved:
+            self._on_saved(room_id, filename)
+
+    def _finish(self, frames, future):
+        self._slots.release()
+        with self._lock:
+            frames.pending.discard(future)
+        if future.exception() is not None:
+            print(f"⚠️ Image Save Error: {future.exception()}")
+
+
+def _atomic_write(path, payload):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".part"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def _write_thumbnail(frame_path, thumb_path):
+    with open(frame_path, "rb") as f:
+        _atomic_write(thumb_path, make_thumbnail(f.read()))
+
+
+def make_thumbnail(jpeg_bytes, size=THUMB_SIZE, quality=THUMB_QUALITY):
+    """Small JPEG preview. draft() lets libjpeg decode at 1/2..1/8 scale directly."""
+    img = Image.open(io.BytesIO(jpeg_bytes))
+    img.draft('RGB', size)
+    img = img.convert('RGB')
+    img.thumbnail(size)
+    out = io.BytesIO()
+    img.save(out, 'JPEG', quality=quality)
+    return out.getvalue()
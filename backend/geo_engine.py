@@ -0,0 +1,550 @@
+import io
+import os
+import re
+import json
+import time
+import shutil
+import hashlib
+import threading
+import numpy as np
+from PIL import Image
+from meshy_client import make_session, HTTP_TIMEOUT
+from mesh_export import to_quantized_glb_bytes
+from cache_index import CacheIndex, dir_size
+
+# --- GEO ENGINE (GeoSculptor) ---
+# Server-side port of src/utils/geo/fetchBuilding.ts and fetchTerrain.ts.
+# Mapbox terrain-RGB tiles and Overpass building footprints are fetched once,
+# decoded into NumPy arrays and kept in a content-addressed disk cache that is
+# read back memory-mapped, so a warm request never touches the network or JSON.
+# Meshing works on all buildings at once:
+#  - Clip:    Sutherland-Hodgman against the 100x100 baseplate, one pass per
+#             box side over every ring edge of every building
+#  - Walls:   one quad per ring edge, all rings in a single indexing step
+#  - Caps:    convex rings fan out in one shot; concave ones are ear-clipped
+#             together, every round cutting non-touching ears in all rings
+# The result is one merged, quantized GLB (buildings or terrain + baseplate).
+
+MAPBOX_TOKEN = os.environ.get("MAPBOX_TOKEN") or os.environ.get("VITE_MAPBOX_TOKEN")
+MAPBOX_API_URL = os.environ.get("MAPBOX_API_URL", "https://api.mapbox.com").rstrip('/')
+OVERPASS_URL = os.environ.get("OVERPASS_URL", "https://overpass.kumi.systems/api/interpreter")
+
+GEO_CACHE_DIR = os.environ.get("GEO_CACHE_DIR", os.path.join("cache", "geo"))
+GEO_CACHE_BYTES = int(os.environ.get("GEO_CACHE_BYTES", 256 * 1024 * 1024))
+GEO_CACHE_VERSION = 1  # Bump when the cached array layout changes
+STALE_PART_SECONDS = 3600  # Older .part dirs are leftovers of a crashed put(), not one in flight
+
+MAX_RADIUS_KM = float(os.environ.get("GEO_MAX_RADIUS_KM", 2.0))
+TERRAIN_ZOOM = 12
+BOX_LIMIT = 50.0      # Baseplate spans -50..50 in x and z
+BASE_THICKNESS = 2.0
+LEVEL_HEIGHT = 3.5    # Metres per building:levels
+DEFAULT_HEIGHT = 12.0
+EARTH_RADIUS = 6378137.0
+EPS = 1e-9
+
+
+class GeoFetchError(Exception):
+    """Upstream tile / Overpass request failed."""
+
+
+# --- TILE CACHE (Content-Addressed, Memory-Mapped) ---
+# Each entry is a directory of .npy files named by sha256 of the request key
+# (tile z/x/y or the Overpass query). Entries are published with one atomic
+# rename and evicted least-recently-used once over the byte budget. File I/O
+# goes through `offload` (the app passes tpool.execute); the index stays green.
+
+def cache_key(kind, *parts):
+    text = json.dumps([GEO_CACHE_VERSION, kind] + list(parts), separators=(',', ':'))
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class TileCache:
+    def __init__(self, root=GEO_CACHE_DIR, budget_bytes=GEO_CACHE_BYTES, offload=None):
+        self.root = root
+        self.index = CacheIndex(budget_bytes)
+        self._offload = offload or (lambda fn, *args: fn(*args))  # Blocking disk work goes here
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Rebuild the LRU order from disk, using mtime as last use; drops stale half-written entries."""
+        entries = []
+        now = time.time()
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue  # Published or evicted by another process meanwhile
+            if name.endswith('.part'):
+                # Other processes (e.g. spawned workers importing the app) may be mid-put()
+                if now - st.st_mtime > STALE_PART_SECONDS:
+                    shutil.rmtree(path, ignore_errors=True)
+            elif os.path.isdir(path):
+                entries.append((st.st_mtime, name, dir_size(path)))
+        self.index.load(entries)
+
+    def _entry_path(self, key):
+        return os.path.join(self.root, key)
+
+    def get(self, key):
+        """{name: read-only memmap} on a hit (and marks it recently used), else None."""
+        if not self.index.hit(key):
+            return None
+        try:
+            return self._offload(self._open, key)
+        except (FileNotFoundError, ValueError):
+            self.index.discard(key)
+            return None
+
+    def put(self, key, arrays):
+        """Stores {name: array} and returns it memory-mapped from the cache."""
+        size = self._offload(self._write, key, arrays)
+        if size is None:
+            return arrays  # Serve this request uncached
+        victims = self.index.add(key, size)
+        if victims:
+            self._offload(self._remove, victims)
+        return self._offload(self._open, key)
+
+    def _open(self, key):
+        path = self._entry_path(key)
+        os.utime(path)
+        return {name[:-4]: np.load(os.path.join(path, name), mmap_mode='r')
+                for name in os.listdir(path) if name.endswith('.npy')}
+
+    def _write(self, key, arrays):
+        """Publishes the entry with one rename. Returns its size, or None if it could not be stored."""
+        path = self._entry_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+        try:
+            os.makedirs(tmp_path, exist_ok=True)
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_path, name + '.npy'), np.ascontiguousarray(array))
+            os.replace(tmp_path, path)
+        except OSError as e:
+            shutil.rmtree(tmp_path, ignore_errors=True)  # Usually another request published it first
+            if not os.path.isdir(path):
+                print(f"⚠️ Geo Cache Error ({key[:12]}): {e}")
+                return None
+        return dir_size(path)
+
+    def _remove(self, keys):
+        for key in keys:
+            shutil.rmtree(self._entry_path(key), ignore_errors=True)  # Open memmaps stay valid
+
+    def stats(self):
+        return self.index.stats()
+
+
+http = make_session()
+
+
+# --- REQUEST ---
+def geo_request(data):
+    """Validated request parameters; raises ValueError like the other engines."""
+    lat, lon = float(data['lat']), float(data['lon'])
+    if not (-85.0 < lat < 85.0 and -180.0 <= lon <= 180.0):
+        raise ValueError(f"Coordinates out of range: {lat}, {lon}")
+    params = {'lat': lat, 'lon': lon, 'mode': 'terrain' if data.get('mode') == 'terrain' else 'city',
+              'base': bool(data.get('base', True))}
+    if params['mode'] == 'city':
+        params['radius'] = float(data.get('radius', 0.2))
+        if not 0.01 <= params['radius'] <= MAX_RADIUS_KM:
+            raise ValueError(f"radius must be between 0.01 and {MAX_RADIUS_KM} km")
+    else:
+        params['zoom'] = int(data.get('zoom', TERRAIN_ZOOM))
+        params['exaggeration'] = float(data.get('exaggeration', 1.0))
+        if not 0 <= params['zoom'] <= 15:
+            raise ValueError("zoom must be between 0 and 15")
+    return params
+
+
+# --- TERRAIN ---
+def tile_coords(lat, lon, zoom):
+    """Slippy-map tile holding the point (same as geoShared.getTileCoords)."""
+    n = 2 ** zoom
+    lat_rad = np.radians(lat)
+    x = int(np.floor(n * (lon + 180.0) / 360.0))
+    y = int(np.floor(n * (1 - np.log(np.tan(lat_rad) + 1 / np.cos(lat_rad)) / np.pi) / 2))
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+def decode_terrain_rgb(rgb):
+    """uint8[H, W, 3+] terrain-RGB pixels -> float32[H, W] metres: -10000 + (R*65536 + G*256 + B) * 0.1."""
+    rgb = np.asarray(rgb)
+    code = (rgb[..., 0].astype(np.uint32) << 16) | (rgb[..., 1].astype(np.uint32) << 8) | rgb[..., 2]
+    return (code * 0.1 - 10000.0).astype(np.float32)
+
+
+def _decode_tile(content):
+    return decode_terrain_rgb(np.asarray(Image.open(io.BytesIO(content)).convert('RGB')))
+
+
+def fetch_terrain(cache, zoom, x, y, session=None, token=None, base_url=None, offload=None):
+    """Heightmap of one tile -> (float32[256, 256] memmap, cached?)."""
+    offload = offload or (lambda fn, *args: fn(*args))
+    key = cache_key('terrain-rgb', zoom, x, y)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit['heights'], True
+
+    url = f"{(base_url or MAPBOX_API_URL).rstrip('/')}/v4/mapbox.terrain-rgb/{zoom}/{x}/{y}.pngraw"
+    try:
+        res = (session or http).get(url, params={'access_token': token or MAPBOX_TOKEN or ''},
+                                    timeout=HTTP_TIMEOUT)
+        res.raise_for_status()
+        heights = offload(_decode_tile, res.content)
+    except Exception as e:
+        raise GeoFetchError(f"Terrain tile {zoom}/{x}/{y} failed: {e}")
+    return cache.put(key, {'heights': heights})['heights'], False
+
+
+def terrain_mesh(heights, exaggeration=1.0):
+    """Tile as a grid over the baseplate, north at -z, lowest point on y = 0."""
+    heights = np.asarray(heights, dtype=np.float64)
+    rows, cols = heights.shape
+    xs = np.linspace(-BOX_LIMIT, BOX_LIMIT, cols)
+    zs = np.linspace(-BOX_LIMIT, BOX_LIMIT, rows)
+    vertices = np.empty((rows, cols, 3), dtype=np.float32)
+    vertices[..., 0] = xs[None, :]
+    vertices[..., 1] = (heights - heights.min()) * 0.05 * exaggeration
+    vertices[..., 2] = zs[:, None]
+
+    v00 = (np.arange(rows - 1)[:, None] * cols + np.arange(cols - 1)[None, :]).ravel()
+    v01, v10, v11 = v00 + 1, v00 + cols, v00 + cols + 1
+    faces = np.concatenate([np.stack([v00, v10, v01], axis=1), np.stack([v01, v10, v11], axis=1)])
+    return vertices.reshape(-1, 3), faces
+
+
+def base_mesh():
+    """The 100 x 2 x 100 baseplate under y = 0."""
+    vertices = np.array([[x, y, z] for x in (-BOX_LIMIT, BOX_LIMIT)
+                         for y in (-BASE_THICKNESS, 0.0) for z in (-BOX_LIMIT, BOX_LIMIT)], dtype=np.float32)
+    faces = np.array([
+        [0, 1, 3], [0, 3, 2], [4, 6, 7], [4, 7, 5], [0, 4, 5], [0, 5, 1],
+        [2, 3, 7], [2, 7, 6], [0, 2, 6], [0, 6, 4], [1, 5, 7], [1, 7, 3],
+    ])
+    return vertices, faces
+
+
+# --- BUILDINGS ---
+def building_bbox(lat, lon, radius_km):
+    """Overpass bbox (south, west, north, east) with the same 1.5x margin as the browser."""
+    fetch_radius = radius_km * 1.5
+    lat_offset = fetch_radius / 111
+    lon_offset = fetch_radius / (111 * np.cos(np.radians(lat)))
+    return lat - lat_offset, lon - lon_offset, lat + lat_offset, lon + lon_offset
+
+
+def overpass_query(bbox):
+    box = ','.join(f"{v:.6f}" for v in bbox)  # 6 decimals (~0.1 m) so nearby requests share a cache key
+    return (f'[out:json][timeout:25];(way["building"]({box});way["building:part"]({box});'
+            f'relation["building"]({box}););out geom;')
+
+
+_NUMBER = re.compile(r'\s*([-+]?(?:\d+\.?\d*|\.\d+))')
+_JSON_SPACE = re.compile(r'[ \t\n\r]*')
+
+
+def _tag_number(tags, key, per_unit=1.0):
+    match = _NUMBER.match(str(tags.get(key, '')))  # Leading number like parseFloat ("12 m" -> 12)
+    return float(match.group(1)) * per_unit if match else None
+
+
+def parse_buildings(elements):
+    """Overpass elements -> flat arrays: lat/lon points, ring offsets and per-ring heights in metres."""
+    points, offsets, heights, min_heights = [], [0], [], []
+    for el in elements:
+        if el.get('type') != 'way' or not el.get('geometry'):
+            continue
+        tags = el.get('tags') or {}
+        height = _tag_number(tags, 'height')
+        if height is None:
+            height = _tag_number(tags, 'building:levels', LEVEL_HEIGHT)
+        min_height = _tag_number(tags, 'min_height')
+        if min_height is None:
+            min_height = _tag_number(tags, 'building:min_level', LEVEL_HEIGHT)
+        ring = [(node['lat'], node['lon']) for node in el['geometry'] if node]
+        if len(ring) > 1 and ring[0] == ring[-1]:
+            ring.pop()  # Ways come back closed
+        if len(ring) < 3:
+            continue
+        points.extend(ring)
+        offsets.append(len(points))
+        heights.append(DEFAULT_HEIGHT if height is None else height)
+        min_heights.append(min_height or 0.0)
+    return {
+        'points': np.array(points, dtype=np.float64).reshape(-1, 2),
+        'offsets': np.array(offsets, dtype=np.int64),
+        'heights': np.array(heights, dtype=np.float32),
+        'min_heights': np.array(min_heights, dtype=np.float32),
+    }
+
+
+def overpass_elements(text):
+    """
+    Yields the 'elements' of an Overpass JSON answer one at a time.
+    json.loads holds the GIL for the whole document (~0.5 s for a 10 MB city),
+    which stalls the event loop even from a native thread; decoding element by
+    element lets the interpreter switch threads in between.
+    """
+    decoder = json.JSONDecoder()
+
+    def skip(pos, token=None):
+        pos = _JSON_SPACE.match(text, pos).end()
+        if token is not None:
+            if text[pos:pos + 1] != token:
+                raise ValueError(f"Expected {token!r} at offset {pos}")
+            pos = _JSON_SPACE.match(text, pos + 1).end()
+        return pos
+
+    def skip_comma(pos, closer):
+        pos = skip(pos)
+        return pos if text[pos:pos + 1] == closer else skip(pos, ',')
+
+    pos = skip(0, '{')
+    while text[pos:pos + 1] != '}':
+        key, pos = decoder.raw_decode(text, pos)
+        pos = skip(pos, ':')
+        if key == 'elements':
+            pos = skip(pos, '[')
+            while text[pos:pos + 1] != ']':
+                element, pos = decoder.raw_decode(text, pos)
+                yield element
+                pos = skip_comma(pos, ']')
+            pos += 1
+        else:
+            _, pos = decoder.raw_decode(text, pos)
+        pos = skip_comma(pos, '}')
+
+
+def _decode_overpass(content):
+    return parse_buildings(overpass_elements(content.decode('utf-8')))
+
+
+def fetch_buildings(cache, lat, lon, radius_km, session=None, base_url=None, offload=None):
+    """Footprints around the point -> (arrays from parse_buildings, memory-mapped, cached?)."""
+    offload = offload or (lambda fn, *args: fn(*args))
+    query = overpass_query(building_bbox(lat, lon, radius_km))
+    key = cache_key('overpass', query)
+    hit = cache.get(key)
+    if hit is not None:
+        return hit, True
+
+    try:
+        res = (session or http).post(base_url or OVERPASS_URL, data={'data': query}, timeout=HTTP_TIMEOUT)
+        res.raise_for_status()
+        buildings = offload(_decode_overpass, res.content)
+    except Exception as e:
+        raise GeoFetchError(f"Overpass request failed: {e}")
+    return cache.put(key, buildings), False
+
+
+def _ring_layout(ring, count):
+    """Start index, position within the ring and ring length for each point of sorted ring ids."""
+    counts = np.bincount(ring, minlength=count)
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    position = np.arange(len(ring)) - starts[ring]
+    return starts, position, counts
+
+
+def _next_in_ring(ring, count):
+    starts, position, counts = _ring_layout(ring, count)
+    index = np.arange(len(ring))
+    return np.where(position == counts[ring] - 1, starts[ring], index + 1)
+
+
+def clip_rings(xy, ring, count, limit=BOX_LIMIT):
+    """
+    Sutherland-Hodgman against the square |x|, |y| <= limit for every ring at once.
+    Each edge emits its crossing point and/or its end point, so the output stays
+    grouped by ring. Rings fully outside come back empty.
+    """
+    for axis, sign in ((0, 1.0), (0, -1.0), (1, 1.0), (1, -1.0)):
+        if not len(xy):
+            break
+        nxt = _next_in_ring(ring, count)
+        side = sign * xy[:, axis]
+        inside = side <= limit
+        next_inside = inside[nxt]
+        crossing = inside != next_inside
+
+        denom = side[nxt] - side
+        t = (limit - side) / np.where(crossing, denom, 1.0)
+        cut = xy + t[:, None] * (xy[nxt] - xy)
+
+        emitted = crossing.astype(np.int64) + next_inside
+        offset = np.cumsum(emitted) - emitted
+        out = np.empty((emitted.sum(), 2))
+        out[offset[crossing]] = cut[crossing]
+        out[(offset + crossing)[next_inside]] = xy[nxt][next_inside]
+        xy, ring = out, np.repeat(ring, emitted)
+    return xy, ring
+
+
+def _clean_rings(xy, ring, count):
+    """Drops repeated points (clipping leaves some on the box edge), then rings under 3 points."""
+    for _ in range(2):
+        nxt = _next_in_ring(ring, count)
+        keep = np.linalg.norm(xy[nxt] - xy, axis=1) > EPS
+        xy, ring = xy[keep], ring[keep]
+    counts = np.bincount(ring, minlength=count)
+    keep = counts[ring] >= 3
+    return xy[keep], ring[keep]
+
+
+def _first_per_ring(ring, score):
+    """Index of the highest-scoring entry of every ring present (entries grouped by ring)."""
+    order = np.lexsort((-score, ring))
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = ring[order][1:] != ring[order][:-1]
+    return order[first]
+
+
+def ear_clip_rings(xy, ring, count):
+    """
+    Triangulates counter-clockwise simple rings (points grouped by ring) -> (T, 3) indices.
+    Every round tests all live corners of all rings for ears at once and cuts
+    the ears whose triangles share no vertex, so rings shrink in parallel.
+    """
+    n = len(xy)
+    nxt = _next_in_ring(ring, count)
+    prv = np.empty(n, dtype=np.int64)
+    prv[nxt] = np.arange(n)
+    alive = np.ones(n, dtype=bool)
+    live = np.bincount(ring, minlength=count)
+    triangles = []
+
+    while True:
+        corner = np.nonzero(alive & (live[ring] > 3))[0]
+        if not len(corner):
+            break
+        p = xy[corner]
+        turn = _cross(p - xy[prv[corner]], xy[nxt[corner]] - p)
+        convex = turn > EPS
+
+        # Convex corner x reflex corner pairs within each ring: a reflex point inside blocks the ear
+        cand, reflex = corner[convex], corner[~convex]
+        r_count = np.bincount(ring[reflex], minlength=count)
+        r_start = np.cumsum(r_count) - r_count
+        reps = r_count[ring[cand]]
+        pair_cand = np.repeat(np.arange(len(cand)), reps)
+        pair_reflex = reflex[r_start[ring[cand]][pair_cand] + np.arange(reps.sum())
+                             - np.repeat(np.cumsum(reps) - reps, reps)]
+        a, b, c, q = xy[prv[cand]][pair_cand], xy[cand][pair_cand], xy[nxt[cand]][pair_cand], xy[pair_reflex]
+        inside = (_cross(b - a, q - a) > EPS) & (_cross(c - b, q - b) > EPS) & (_cross(a - c, q - c) > EPS)
+        blocked = np.bincount(pair_cand, weights=inside, minlength=len(cand)) > 0
+
+        ear = np.zeros(n, dtype=bool)
+        ear[cand[~blocked]] = True
+        # Cut an ear only if the next two corners are not ears, so cut triangles never touch
+        cut = corner[ear[corner] & ~ear[nxt[corner]] & ~ear[nxt[nxt[corner]]]]
+        stuck = np.bincount(ring[cut], minlength=count)[ring[corner]] == 0
+        if stuck.any():
+            # Every corner an ear (or none, on degenerate rings): cut the best corner of each
+            score = turn[stuck] + ear[corner[stuck]] * 1e9
+            cut = np.concatenate([cut, corner[stuck][_first_per_ring(ring[corner[stuck]], score)]])
+
+        triangles.append(np.stack([prv[cut], cut, nxt[cut]], axis=1))
+        nxt[prv[cut]] = nxt[cut]
+        prv[nxt[cut]] = prv[cut]
+        alive[cut] = False
+        live -= np.bincount(ring[cut], minlength=count)
+
+    last = np.nonzero(alive)[0]
+    last = last[_first_per_ring(ring[last], np.zeros(len(last)))]
+    triangles.append(np.stack([last, nxt[last], nxt[nxt[last]]], axis=1))
+    return np.concatenate(triangles)
+
+
+def _cross(u, v):
+    return u[..., 0] * v[..., 1] - u[..., 1] * v[..., 0]
+
+
+def extrude_buildings(buildings, lat, lon, radius_km):
+    """All footprints -> one (vertices, faces) mesh in baseplate units, y up, north at -z."""
+    points = np.asarray(buildings['points'], dtype=np.float64)
+    offsets = np.asarray(buildings['offsets'])
+    count = len(offsets) - 1
+    if count == 0:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.int64)
+
+    # Metres around the centre (latLonToMeters), then baseplate units
+    scale = BOX_LIMIT / (radius_km * 1000)
+    xy = np.empty_like(points)
+    xy[:, 0] = np.radians(points[:, 1] - lon) * np.cos(np.radians(lat)) * EARTH_RADIUS * scale
+    xy[:, 1] = np.radians(points[:, 0] - lat) * EARTH_RADIUS * scale
+    ring = np.repeat(np.arange(count), np.diff(offsets))
+
+    top = np.asarray(buildings['heights'], dtype=np.float64) * scale
+    bottom = np.asarray(buildings['min_heights'], dtype=np.float64) * scale
+    solid = (top > bottom)[ring]
+    xy, ring = clip_rings(xy[solid], ring[solid], count)
+    xy, ring = _clean_rings(xy, ring, count)
+    if not len(xy):
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.int64)
+
+    # Orientation (ensureCCW): reverse clockwise rings in place
+    starts, position, counts = _ring_layout(ring, count)
+    nxt = _next_in_ring(ring, count)
+    area = np.bincount(ring, weights=_cross(xy, xy[nxt]), minlength=count)
+    flip = area[ring] < 0
+    order = np.where(flip, starts[ring] + counts[ring] - 1 - position, np.arange(len(xy)))
+    xy = xy[order]
+
+    # Two vertices per footprint point: index i at the bottom, i + n at the top
+    n = len(xy)
+    vertices = np.empty((2 * n, 3), dtype=np.float32)
+    vertices[:, 0] = np.tile(xy[:, 0], 2)
+    vertices[:, 1] = np.concatenate([bottom[ring], top[ring]])
+    vertices[:, 2] = -np.tile(xy[:, 1], 2)
+
+    i = np.arange(n)
+    walls = np.concatenate([np.stack([i, nxt, nxt + n], axis=1), np.stack([i, nxt + n, i + n], axis=1)])
+
+    # Caps: fans for convex rings, ear clipping for the rest
+    prev = np.where(position == 0, starts[ring] + counts[ring] - 1, i - 1)
+    concave = np.bincount(ring, weights=_cross(xy - xy[prev], xy[nxt] - xy) < -EPS, minlength=count) > 0
+    fan = ~concave[ring] & (position >= 1) & (position <= counts[ring] - 2)
+    clip = np.nonzero(concave[ring])[0]
+    caps = np.concatenate([np.stack([starts[ring][fan], i[fan], nxt[fan]], axis=1),
+                           clip[ear_clip_rings(xy[clip], ring[clip], count)]])
+
+    # (x, y, h) -> (x, h, -y) is a rotation, so plan winding carries over: roofs face up, floors down
+    faces = np.concatenate([walls, caps + n, caps[:, [0, 2, 1]]])
+    return vertices, faces
+
+
+# --- MODEL ---
+def fetch_source(params, cache, session=None, offload=None):
+    """Network / cache side of a request -> (source arrays, cached?). Decoding goes through offload."""
+    if params['mode'] == 'terrain':
+        x, y = tile_coords(params['lat'], params['lon'], params['zoom'])
+        return fetch_terrain(cache, params['zoom'], x, y, session, offload=offload)
+    return fetch_buildings(cache, params['lat'], params['lon'], params['radius'], session, offload=offload)
+
+
+def merge_meshes(meshes):
+    meshes = [(v, f) for v, f in meshes if len(f)]
+    if not meshes:
+        return np.zeros((0, 3), dtype=np.float32), np.zeros((0, 3), dtype=np.int64)
+    shift = np.cumsum([0] + [len(v) for v, _ in meshes[:-1]])
+    vertices = np.concatenate([np.asarray(v, dtype=np.float32) for v, _ in meshes])
+    faces = np.concatenate([np.asarray(f, dtype=np.int64) + s for (_, f), s in zip(meshes, shift)])
+    return vertices, faces
+
+
+def model_glb(params, source):
+    """CPU side of a request: mesh the source, add the baseplate, pack one GLB. Returns (bytes, info)."""
+    if params['mode'] == 'terrain':
+        mesh = terrain_mesh(source, params['exaggeration'])
+    else:
+        mesh = extrude_buildings(source, params['lat'], params['lon'], params['radius'])
+    parts = [mesh, base_mesh()] if params['base'] else [mesh]
+    vertices, faces = merge_meshes(parts)
+    info = {'mode': params['mode'], 'triangles': len(faces)}
+    if params['mode'] == 'city':
+        info['buildings'] = len(source['offsets']) - 1
+    return to_quantized_glb_bytes(vertices, faces), info
@@ -0,0 +1,171 @@
+import os
+import time
+import uuid
+import threading
+from collections import deque, defaultdict
+
+# --- JOB SCHEDULER ---
+# Bounded queue + fixed worker pool for long-running work (Meshy reconstructions).
+# Each job has a key (the room); at most `per_key_limit` jobs per key run at once,
+# so one busy room can't occupy every worker.
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 4))
+JOB_QUEUE_SIZE = int(os.environ.get("JOB_QUEUE_SIZE", 32))
+JOB_PER_KEY_LIMIT = int(os.environ.get("JOB_PER_KEY_LIMIT", 1))
+JOB_RETENTION = 3600  # Seconds a finished job stays visible on /jobs/<id>
+
+FINISHED = ('succeeded', 'failed', 'cancelled')
+
+
+class QueueFull(Exception):
+    pass
+
+
+class Job:
+    def __init__(self, key, fn, args, on_update):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.status = 'queued'
+        self.step = 'Queued...'
+        self.progress = 0.0
+        self.result = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self._on_update = on_update
+
+    def report(self, step, progress=None):
+        """Progress hook for the running function; pushed to listeners."""
+        self.step = step
+        if progress is not None:
+            self.progress = progress
+        self._on_update(self)
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def to_dict(self):
+        now = self.finished_at or time.time()
+        return {
+            'id': self.id,
+            'key': self.key,
+            'status': self.status,
+            'step': self.step,
+            'progress': round(self.progress, 3),
+            'result': self.result,
+            'queuedFor': round((self.started_at or now) - self.created_at, 3),
+            'runningFor': round(now - self.started_at, 3) if self.started_at else 0,
+        }
+
+
+class JobScheduler:
+    def __init__(self, workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE,
+                 per_key_limit=JOB_PER_KEY_LIMIT, spawn=None, on_update=None):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.per_key_limit = per_key_limit
+        self._spawn = spawn or (lambda fn: threading.Thread(target=fn, daemon=True).start())
+        self._on_update = on_update or (lambda job: None)
+        self._queue = deque()
+        self._running = defaultdict(int)
+        self._jobs = {}
+        self._cond = threading.Condition()
+        self._started = False
+
+    def start(self):
+        with self._cond:
+            if self._started:
+                return
+            self._started = True
+        for _ in range(self.workers):
+            self._spawn(self._worker)
+
+    def submit(self, key, fn, *args):
+        """Queues fn(job, *args). Raises QueueFull when the backlog is at capacity."""
+        self.start()
+        with self._cond:
+            self._prune()
+            if len(self._queue) >= self.max_queue:
+                raise QueueFull(f"{len(self._queue)} jobs already queued")
+            job = Job(key, fn, args, self._on_update)
+            self._jobs[job.id] = job
+            self._queue.append(job)
+            self._cond.notify_all()
+        return job
+
+    def get(self, job_id):
+        with self._cond:
+            return self._jobs.get(job_id)
+
+    def cancel_key(self, key):
+        """Cancels every queued or running job for a key. Returns how many."""
+        cancelled = []
+        with self._cond:
+            for job in self._jobs.values():
+                if job.key == key and job.status not in FINISHED:
+                    job.cancel_event.set()
+                    cancelled.append(job)
+            for job in [j for j in self._queue if j.key == key]:
+                self._queue.remove(job)
+                self._finish(job, 'cancelled', 'CANCELLED')
+        for job in cancelled:
+            self._on_update(job)
+        return len(cancelled)
+
+    def stats(self):
+        with self._cond:
+            return {
+                'queued': len(self._queue),
+                'running': sum(self._running.values()),
+                'workers': self.workers,
+            }
+
+    # --- INTERNALS ---
+    def _next_runnable(self):
+        for job in self._queue:
+            if self._running[job.key] < self.per_key_limit:
+                self._queue.remove(job)
+                return job
+        return None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                job = self._next_runnable()
+                while job is None:
+                    self._cond.wait()
+                    job = self._next_runnable()
+                self._running[job.key] += 1
+                job.status = 'running'
+                job.started_at = time.time()
+
+            try:
+                result = job.fn(job, *job.args)
+                status = 'cancelled' if job.cancelled else 'succeeded' if result == 'SUCCESS' else 'failed'
+            except Exception as e:
+                print(f"💥 Job {job.id} crashed: {e}")
+                result, status = 'CRASH', 'failed'
+                job.step = 'Failed: CRASH'  # Like run_reconstruction's failures, so the desktop sees it
+
+            with self._cond:
+                self._running[job.key] -= 1
+                if not self._running[job.key]:
+                    del self._running[job.key]
+                self._finish(job, status, result)
+                self._cond.notify_all()
+            self._on_update(job)
+
+    def _finish(self, job, status, result):
+        job.status = status
+        job.result = result
+        job.finished_at = time.time()
+        job.progress = 1.0 if status == 'succeeded' else job.progress
+
+    def _prune(self):
+        cutoff = time.time() - JOB_RETENTION
+        for job_id in [i for i, j in self._jobs.items() if j.finished_at and j.finished_at < cutoff]:
+            del self._jobs[job_id]
@@ -0,0 +1,197 @@
+import os
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import cv2
+import numpy as np
+
+# --- KEYFRAME SELECTION ---
+# Cheap per-frame features are computed once, right after a frame is written,
+# and cached next to the scan in scans/<room>/features/<frame>.npz. Picking the
+# views for Meshy then only loads those small arrays:
+#   1. quality  = Laplacian-variance sharpness x exposure (clipping, mid-grey)
+#   2. coverage = greedy facility-location over perceptual-hash similarity,
+#                 so each pick covers frames the previous picks did not
+#   3. ORB match check to skip near-duplicates of an already chosen view
+
+FEATURE_FOLDER = 'features'
+FEATURE_WORKERS = int(os.environ.get("FEATURE_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+ANALYSIS_WIDTH = 320
+ORB_FEATURES = 64
+HIST_BINS = 32
+DUPLICATE_MATCH_RATIO = 0.6
+
+
+# --- FEATURE EXTRACTION (runs in worker processes) ---
+def _phash(gray):
+    """64-bit DCT perceptual hash, packed into 8 bytes."""
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].ravel()
+    return np.packbits(low > np.median(low[1:]))
+
+
+def compute_features(frame_path):
+    """Sharpness, exposure and view descriptors of one JPEG (downscaled grey)."""
+    gray = cv2.imread(frame_path, cv2.IMREAD_REDUCED_GRAYSCALE_2)
+    if gray is None:
+        raise ValueError(f"Unreadable frame: {frame_path}")
+    if gray.shape[1] > ANALYSIS_WIDTH:
+        height = max(1, round(gray.shape[0] * ANALYSIS_WIDTH / gray.shape[1]))
+        gray = cv2.resize(gray, (ANALYSIS_WIDTH, height), interpolation=cv2.INTER_AREA)
+
+    hist = cv2.calcHist([gray], [0], None, [HIST_BINS], [0, 256]).ravel()
+    hist /= max(hist.sum(), 1.0)
+    _, descriptors = cv2.ORB_create(nfeatures=ORB_FEATURES).detectAndCompute(gray, None)
+
+    return {
+        'sharpness': np.float32(cv2.Laplacian(gray, cv2.CV_32F).var()),
+        'brightness': np.float32(gray.mean() / 255.0),
+        'clipped': np.float32(hist[0] + hist[-1]),
+        'hist': hist.astype(np.float32),
+        'phash': _phash(gray),
+        'orb': descriptors if descriptors is not None else np.zeros((0, 32), np.uint8),
+    }
+
+
+def feature_path(session_path, filename):
+    return os.path.join(session_path, FEATURE_FOLDER, filename + '.npz')
+
+
+def extract_to_cache(session_path, filename):
+    """Worker entry point: compute and atomically store one frame's features."""
+    target = feature_path(session_path, filename)
+    if os.path.exists(target):
+        return filename
+    features = compute_features(os.path.join(session_path, filename))
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = target + '.part.npz'
+    np.savez(tmp_path, **features)
+    os.replace(tmp_path, target)
+    return filename
+
+
+def _extract_batch(session_path, filenames):
+    done = []
+    for name in filenames:
+        try:
+            done.append(extract_to_cache(session_path, name))
+        except Exception as e:
+            print(f"⚠️ Feature Error ({name}): {e}")
+    return done
+
+
+def load_features(session_path, filename):
+    path = feature_path(session_path, filename)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
+
+
+# --- FEATURE CACHE (process pool front-end) ---
+class FeatureCache:
+    def __init__(self, workers=FEATURE_WORKERS, batch_size=8):
+        self.workers = workers
+        self.batch_size = batch_size
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._inflight = {}
+
+    def _executor(self):
+        # Frames land from several writer threads at once; only one may build the pool
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: children must not inherit the server's green-thread hub
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context('spawn'))
+                atexit.register(self.shutdown)  # Green-patched interpreters hang joining it otherwise
+            return self._pool
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    def warm(self, session_path, filename):
+        """Ingest-time hook: start extracting a freshly written frame."""
+        key = (session_path, filename)
+        if key not in self._inflight:
+            future = self._executor().submit(_extract_batch, session_path, [filename])
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._inflight.pop(key, None))
+
+    def ensure(self, session_path, filenames):
+        """Waits for in-flight frames and batch-extracts whatever is still missing."""
+        for name in filenames:
+            future = self._inflight.get((session_path, name))
+            if future is not None:
+                future.result()
+        missing = [f for f in filenames if not os.path.exists(feature_path(session_path, f))]
+        if missing:
+            chunks = [missing[i:i + self.batch_size] for i in range(0, len(missing), self.batch_size)]
+            futures = [self._executor().submit(_extract_batch, session_path, c) for c in chunks]
+            for future in futures:
+                future.result()
+        return {f: load_features(session_path, f) for f in filenames}
+
+
+# --- SELECTION ---
+def quality_scores(features):
+    """0..1 per frame: sharpness relative to the session, times exposure quality."""
+    sharp = np.array([f['sharpness'] for f in features], dtype=np.float64)
+    brightness = np.array([f['brightness'] for f in features], dtype=np.float64)
+    clipped = np.array([f['clipped'] for f in features], dtype=np.float64)
+
+    reference = max(np.median(sharp), 1e-6)
+    sharpness = np.clip(sharp / reference, 0, 1.5) / 1.5
+    exposure = np.clip(1.0 - 2.0 * clipped - np.abs(brightness - 0.5), 0, 1)
+    return np.maximum(sharpness * exposure, 1e-3)
+
+
+def similarity_matrix(features):
+    """1 for identical perceptual hashes, 0 at (or beyond) unrelated-image distance."""
+    hashes = np.stack([f['phash'] for f in features])
+    diff = np.unpackbits(hashes[:, None, :] ^ hashes[None, :, :], axis=2).sum(axis=2)
+    return np.clip(1.0 - diff / 32.0, 0, 1)
+
+
+def _orb_overlap(a, b, matcher):
+    if len(a) < 2 or len(b) < 2:
+        return 0.0
+    pairs = matcher.knnMatch(a, b, k=2)
+    good = sum(1 for p in pairs if len(p) == 2 and p[0].distance < 0.75 * p[1].distance)
+    return good / min(len(a), len(b))
+
+
+def select_keyframes(filenames, features, count=4):
+    """Greedy max-coverage pick of `count` frames, returned in capture order."""
+    usable = [i for i, f in enumerate(features) if f is not None]
+    if len(usable) <= count:
+        return [filenames[i] for i in usable]
+    feats = [features[i] for i in usable]
+
+    quality = quality_scores(feats)
+    gain_matrix = similarity_matrix(feats) * quality[None, :]  # row i covered by column j
+    coverage = np.zeros(len(usable))
+    matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+    chosen = []
+    available = np.ones(len(usable), dtype=bool)
+
+    while len(chosen) < count and available.any():
+        gains = np.maximum(gain_matrix - coverage[:, None], 0).sum(axis=0)
+        gains[~available] = -1
+        pick = int(np.argmax(gains))
+        available[pick] = False
+        if any(_orb_overlap(feats[pick]['orb'], feats[c]['orb'], matcher) > DUPLICATE_MATCH_RATIO
+               for c in chosen):
+            continue  # Same view as an earlier pick
+        chosen.append(pick)
+        coverage = np.maximum(coverage, gain_matrix[:, pick])
+
+    if len(chosen) < count:
+        # Everything left was a near-duplicate; top up with the best remaining frames
+        rest = [i for i in np.argsort(-quality) if i not in chosen]
+        chosen += rest[:count - len(chosen)]
+
+    return [filenames[usable[i]] for i in sorted(chosen)]
@@ -0,0 +1,215 @@
+import os
+import json
+import struct
+import numpy as np
+
+# --- MESH EXPORT (Binary STL / GLB) ---
+# Shared writers for the backend engines. Meshes are passed around as a pair of
+# NumPy arrays: vertices (V, 3) float and faces (F, 3) integer indices.
+
+STL_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('v', '<f4', (3, 3)),
+    ('attr', '<u2'),
+])
+
+
+def face_normals(vertices, faces):
+    """Unit normals per triangle, (v1 - v0) x (v2 - v0)."""
+    return _triangle_normals(vertices[faces])
+
+
+def _triangle_normals(tri):
+    n = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    length = np.linalg.norm(n, axis=1, keepdims=True)
+    length[length == 0] = 1.0
+    return n / length
+
+
+def _stl_records(vertices, faces):
+    tri = np.asarray(vertices, dtype=np.float32)[faces]  # Gathered once, reused for normals
+    records = np.zeros(len(faces), dtype=STL_DTYPE)
+    records['normal'] = _triangle_normals(tri)
+    records['v'] = tri
+    return records
+
+
+def to_stl_bytes(vertices, faces):
+    """Binary STL, packed in one shot through a structured array."""
+    records = _stl_records(vertices, np.asarray(faces, dtype=np.int64))
+    header = b'dualSculp binary STL'.ljust(80, b' ')
+    return header + struct.pack('<I', len(records)) + records.tobytes()
+
+
+def _gltf_document(vertex_count, index_count, pos_min, pos_max):
+    """glTF JSON for one indexed mesh: float32 positions then uint32 indices in one buffer."""
+    pos_len = vertex_count * 12
+    idx_len = index_count * 4
+    return {
+        'asset': {'version': '2.0', 'generator': 'dualSculp'},
+        'scene': 0,
+        'scenes': [{'nodes': [0]}],
+        'nodes': [{'mesh': 0}],
+        'meshes': [{'primitives': [{'attributes': {'POSITION': 0}, 'indices': 1}]}],
+        'buffers': [{'byteLength': pos_len + idx_len}],
+        'bufferViews': [
+            {'buffer': 0, 'byteOffset': 0, 'byteLength': pos_len, 'target': 34962},
+            {'buffer': 0, 'byteOffset': pos_len, 'byteLength': idx_len, 'target': 34963},
+        ],
+        'accessors': [
+            {'bufferView': 0, 'componentType': 5126, 'count': vertex_count,
+             'type': 'VEC3', 'min': list(pos_min), 'max': list(pos_max)},
+            {'bufferView': 1, 'componentType': 5125, 'count': index_count, 'type': 'SCALAR'},
+        ],
+    }
+
+
+def _glb_prefix(gltf, bin_length):
+    """GLB header + JSON chunk + BIN chunk header; the BIN payload follows."""
+    json_chunk = json.dumps(gltf, separators=(',', ':')).encode('utf-8')
+    json_chunk += b' ' * (-len(json_chunk) % 4)
+    bin_padded = bin_length + (-bin_length % 4)
+    total = 12 + 8 + len(json_chunk) + 8 + bin_padded
+    return b''.join([
+        struct.pack('<4sII', b'glTF', 2, total),
+        struct.pack('<I4s', len(json_chunk), b'JSON'), json_chunk,
+        struct.pack('<I4s', bin_padded, b'BIN\x00'),
+    ])
+
+
+def to_glb_bytes(vertices, faces):
+    """Minimal glTF 2.0 binary: one indexed mesh, float32 positions, uint32 indices."""
+    positions = np.ascontiguousarray(vertices, dtype=np.float32)
+    indices = np.ascontiguousarray(faces, dtype=np.uint32).reshape(-1)
+
+    if len(positions):
+        pos_min = positions.min(axis=0).tolist()
+        pos_max = positions.max(axis=0).tolist()
+    else:
+        pos_min = pos_max = [0.0, 0.0, 0.0]
+
+    bin_chunk = positions.tobytes() + indices.tobytes()
+    gltf = _gltf_document(len(positions), len(indices), pos_min, pos_max)
+    return _glb_prefix(gltf, len(bin_chunk)) + bin_chunk + b'\x00' * (-len(bin_chunk) % 4)
+
+
+def to_quantized_glb_bytes(vertices, faces):
+    """
+    KHR_mesh_quantization GLB: positions as uint16 on the mesh bounding box
+    (the node transform maps them back), uint16 indices when they fit.
+    8 bytes per vertex instead of 12, 2 per index instead of 4 on small meshes.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    if len(vertices) == 0:
+        return to_glb_bytes(vertices, faces)
+    lo = vertices.min(axis=0)
+    extent = np.maximum(vertices.max(axis=0) - lo, 1e-12)
+    quantized = np.zeros((len(vertices), 4), dtype=np.uint16)  # 4th lane pads the stride to 8
+    quantized[:, :3] = np.round((vertices - lo) / extent * 65535)
+
+    small = len(vertices) <= 65535
+    indices = np.ascontiguousarray(faces, dtype=np.uint16 if small else np.uint32).reshape(-1)
+
+    pos_len = quantized.nbytes
+    idx_len = indices.nbytes
+    gltf = _gltf_document(len(vertices), len(indices), [0, 0, 0], [65535, 65535, 65535])
+    gltf['extensionsUsed'] = gltf['extensionsRequired'] = ['KHR_mesh_quantization']
+    gltf['nodes'][0].update(translation=lo.tolist(), scale=(extent / 65535).tolist())
+    gltf['buffers'][0]['byteLength'] = pos_len + idx_len
+    gltf['bufferViews'][0].update(byteLength=pos_len, byteStride=8)
+    gltf['bufferViews'][1].update(byteOffset=pos_len, byteLength=idx_len)
+    gltf['accessors'][0]['componentType'] = 5123
+    gltf['accessors'][1]['componentType'] = 5123 if small else 5125
+
+    bin_chunk = quantized.tobytes() + indices.tobytes()
+    return _glb_prefix(gltf, len(bin_chunk)) + bin_chunk + b'\x00' * (-len(bin_chunk) % 4)
+
+
+# --- STREAMING WRITERS ---
+# For meshes too large to hold at once: feed (vertices, faces) chunks with add(),
+# each chunk indexed on its own, and close() to finalise the file on disk.
+
+class StlWriter:
+    def __init__(self, path):
+        self.path = path
+        self.triangles = 0
+        self._file = open(path, 'wb')
+        self._file.write(b'dualSculp binary STL'.ljust(80, b' ') + struct.pack('<I', 0))
+
+    def add(self, vertices, faces):
+        if len(faces) == 0:
+            return
+        self._file.write(_stl_records(vertices, faces).tobytes())
+        self.triangles += len(faces)
+
+    def close(self):
+        self._file.seek(80)
+        self._file.write(struct.pack('<I', self.triangles))  # Count is only known at the end
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class GlbWriter:
+    """Positions and indices are spooled to side files, then spliced behind the header."""
+
+    def __init__(self, path):
+        self.path = path
+        self.vertex_count = 0
+        self.index_count = 0
+        self._min = np.full(3, np.inf)
+        self._max = np.full(3, -np.inf)
+        self._positions = open(path + '.pos.part', 'w+b')
+        self._indices = open(path + '.idx.part', 'w+b')
+
+    def add(self, vertices, faces):
+        if len(faces) == 0:
+            return
+        vertices = np.ascontiguousarray(vertices, dtype=np.float32)
+        self._min = np.minimum(self._min, vertices.min(axis=0))
+        self._max = np.maximum(self._max, vertices.max(axis=0))
+        self._positions.write(vertices.tobytes())
+        self._indices.write((np.asarray(faces, dtype=np.uint32) + self.vertex_count).tobytes())
+        self.vertex_count += len(vertices)
+        self.index_count += faces.size
+
+    def close(self, chunk_size=1 << 20):
+        if self.vertex_count:
+            pos_min, pos_max = self._min.tolist(), self._max.tolist()
+        else:
+            pos_min = pos_max = [0.0, 0.0, 0.0]
+        gltf = _gltf_document(self.vertex_count, self.index_count, pos_min, pos_max)
+        bin_length = self.vertex_count * 12 + self.index_count * 4
+
+        with open(self.path, 'wb') as out:
+            out.write(_glb_prefix(gltf, bin_length))
+            for spool in (self._positions, self._indices):
+                spool.seek(0)
+                for chunk in iter(lambda: spool.read(chunk_size), b''):
+                    out.write(chunk)
+            out.write(b'\x00' * (-bin_length % 4))
+
+        for spool in (self._positions, self._indices):
+            spool.close()
+            os.remove(spool.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_writer(path, fmt='stl'):
+    return GlbWriter(path) if fmt == 'glb' else StlWriter(path)
+
+
+def export_mesh(vertices, faces, fmt='stl'):
+    """Returns (payload bytes, mimetype) for the requested format."""
+    if fmt == 'glb':
+        return to_glb_bytes(vertices, faces), 'model/gltf-binary'
+    return to_stl_bytes(vertices, faces), 'model/stl'
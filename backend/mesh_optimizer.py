@@ -0,0 +1,391 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import trimesh
+from mesh_export import to_quantized_glb_bytes
+
+try:
+    from fast_simplification import simplify as qem_simplify  # In requirements.txt, used by trimesh too
+except ImportError:
+    qem_simplify = None
+
+# --- MESH OPTIMIZER (Batch LOD Export) ---
+# Batch version of public/models/convert.py for the files the web viewer loads.
+# Each mesh under a source directory is:
+#   1. welded (coincident vertices merged) and stripped of degenerate/duplicate faces
+#   2. decimated to one face budget per LOD level (quadric error metric)
+#   3. written as a quantized GLB (KHR_mesh_quantization)
+# Only positions survive those steps, so meshes with UVs, vertex colours or
+# materials (e.g. Meshy's PBR reconstruction.glb) are instead re-exported by
+# trimesh at full resolution with their appearance intact, and not decimated.
+# Files are processed in parallel across a process pool. A manifest in the
+# output directory (mtime, size, sha256, settings) lets unchanged inputs skip.
+# Usage: python mesh_optimizer.py scans/ optimized/ --lod 1.0 --lod 0.25 --lod 0.05
+
+MESH_EXTENSIONS = ('.stl', '.glb', '.gltf', '.obj', '.ply')
+MANIFEST_NAME = 'manifest.json'
+DEFAULT_LODS = (1.0, 0.25, 0.05)  # <= 1: fraction of the cleaned faces, > 1: face budget
+WELD_TOLERANCE = 1e-6             # Relative to the bounding-box diagonal
+OPTIMIZER_WORKERS = int(os.environ.get("OPTIMIZER_WORKERS", os.cpu_count() or 1))
+
+
+# --- CLEANUP ---
+def load_mesh(path):
+    """The file as trimesh loaded it (mesh or scene) and its triangle meshes."""
+    loaded = trimesh.load(path, process=False)
+    parts = loaded.geometry.values() if isinstance(loaded, trimesh.Scene) else [loaded]
+    return loaded, [part for part in parts if isinstance(part, trimesh.Trimesh)]
+
+
+def is_textured(parts):
+    """UVs, vertex colours or materials on any part (trimesh leaves visual.kind None otherwise)."""
+    return any(part.visual is not None and part.visual.kind is not None for part in parts)
+
+
+def mesh_arrays(loaded):
+    """Raw (vertices, faces) with scenes flattened; welding is done by weld()."""
+    mesh = loaded.to_mesh() if isinstance(loaded, trimesh.Scene) else loaded
+    return np.asarray(mesh.vertices, dtype=np.float64), np.asarray(mesh.faces, dtype=np.int64)
+
+
+def weld(vertices, faces, tolerance=WELD_TOLERANCE):
+    """Merges vertices closer than tolerance, drops degenerate, duplicate and unused geometry."""
+    if len(faces) == 0:
+        return vertices[:0], faces[:0]
+    lo = vertices.min(axis=0)
+    diagonal = np.linalg.norm(vertices.max(axis=0) - lo) or 1.0
+    snapped = np.round((vertices - lo) / (diagonal * tolerance)).astype(np.int64)
+    # One int64 key per vertex: 1-D unique is far faster than unique over rows
+    span = [int(s) for s in snapped.max(axis=0) + 1]
+    if span[0] * span[1] * span[2] < 2 ** 62:
+        key = (snapped[:, 0] * span[1] + snapped[:, 1]) * span[2] + snapped[:, 2]
+        _, first, inverse = np.unique(key, return_index=True, return_inverse=True)
+    else:  # Tiny tolerances: the packed key would overflow
+        _, first, inverse = np.unique(snapped, axis=0, return_index=True, return_inverse=True)
+    faces = inverse.reshape(-1)[faces]
+    vertices = vertices[first]
+    return _clean_faces(vertices, faces)
+
+
+def _clean_faces(vertices, faces):
+    # Collapsed triangles (two corners on one vertex) or zero area
+    keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+    faces = faces[keep]
+    tri = vertices[faces]
+    area = np.linalg.norm(np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]), axis=1)
+    faces = faces[area > 0]
+
+    # Same three vertices in the same winding (cyclic rotations are the same face)
+    lead = np.argmin(faces, axis=1)[:, None]
+    rolled = np.where(lead == 0, faces, np.where(lead == 1, faces[:, [1, 2, 0]], faces[:, [2, 0, 1]]))
+    n = np.int64(len(vertices))
+    if n ** 3 < 2 ** 62:
+        order = np.argsort((rolled[:, 0] * n + rolled[:, 1]) * n + rolled[:, 2], kind='stable')
+    else:
+        order = np.lexsort((rolled[:, 2], rolled[:, 1], rolled[:, 0]))
+    ranked = rolled[order]
+    repeat = np.zeros(len(faces), dtype=bool)
+    repeat[order[1:]] = (ranked[1:] == ranked[:-1]).all(axis=1)
+    faces = faces[~repeat]
+
+    used, faces = np.unique(faces, return_inverse=True)
+    return vertices[used], faces.reshape(-1, 3)
+
+
+# --- DECIMATION ---
+def _vertex_quadrics(vertices, faces):
+    """Area-weighted plane quadrics per vertex, as the 10 upper-triangle terms of a 4x4."""
+    tri = vertices[faces]
+    normal = np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0])
+    area = np.linalg.norm(normal, axis=1)
+    plane = np.empty((len(faces), 4))
+    plane[:, :3] = normal / np.maximum(area, 1e-300)[:, None]
+    plane[:, 3] = -(plane[:, :3] * tri[:, 0]).sum(axis=1)
+
+    rows, cols = np.triu_indices(4)
+    face_q = 0.5 * area[:, None] * plane[:, rows] * plane[:, cols]
+    corners = faces.reshape(-1)
+    return np.stack([np.bincount(corners, weights=np.repeat(face_q[:, k], 3), minlength=len(vertices))
+                     for k in range(10)], axis=1)
+
+
+def _cluster_labels(vertices, lo, cell):
+    index = np.floor((vertices - lo) / cell).astype(np.int64)
+    key = (index[:, 0] * (1 << 21) + index[:, 1]) * (1 << 21) + index[:, 2]
+    _, labels = np.unique(key, return_inverse=True)
+    return labels.reshape(-1)
+
+
+def _surviving_faces(labels, faces):
+    mapped = labels[faces]
+    keep = (mapped[:, 0] != mapped[:, 1]) & (mapped[:, 1] != mapped[:, 2]) & (mapped[:, 0] != mapped[:, 2])
+    return mapped[keep]
+
+
+def cluster_decimate(vertices, faces, target_faces):
+    """
+    Quadric vertex clustering (Lindstrom 2000): vertices sharing a grid cell
+    collapse to the point minimising their summed plane quadrics. The cell size
+    is binary-searched for the finest grid that meets the face budget.
+    Fallback for when fast_simplification (true edge collapse) is not installed.
+    """
+    lo = vertices.min(axis=0)
+    longest = max(float((vertices.max(axis=0) - lo).max()), 1e-12)
+    low, high, best = 1, 4096, None
+    while low <= high:
+        resolution = (low + high) // 2
+        labels = _cluster_labels(vertices, lo, longest / resolution * (1 + 1e-9))
+        if len(_surviving_faces(labels, faces)) <= target_faces:
+            best, low = labels, resolution + 1
+        else:
+            high = resolution - 1
+    if best is None:
+        best = _cluster_labels(vertices, lo, longest * 2)
+
+    # Representative per cluster: argmin x^T A x + 2 b^T x, pulled gently towards
+    # the centroid so flat or linear clusters (singular A) stay well-posed
+    count = best.max() + 1
+    q = np.stack([np.bincount(best, weights=w, minlength=count) for w in _vertex_quadrics(vertices, faces).T], axis=1)
+    centroid = np.stack([np.bincount(best, weights=vertices[:, k], minlength=count) for k in range(3)], axis=1)
+    centroid /= np.bincount(best, minlength=count)[:, None]
+
+    a = q[:, [[0, 1, 2], [1, 4, 5], [2, 5, 7]]]
+    b = q[:, [3, 6, 8]]
+    reg = np.maximum(1e-3 * np.trace(a, axis1=1, axis2=2) / 3, 1e-12)
+    a = a + reg[:, None, None] * np.eye(3)
+    points = np.linalg.solve(a, (reg[:, None] * centroid - b)[..., None])[..., 0]
+
+    # A solution far outside its cell means the quadric was near-degenerate anyway
+    cell = longest / max(low - 1, 1)
+    stray = np.abs(points - centroid).max(axis=1) > cell
+    points[stray] = centroid[stray]
+    return _clean_faces(points, _surviving_faces(best, faces))
+
+
+def decimate(vertices, faces, target_faces):
+    """Reduces to at most ~target_faces; QEM edge collapse when available."""
+    if target_faces >= len(faces):
+        return vertices, faces
+    if qem_simplify is not None:
+        points, triangles = qem_simplify(points=vertices, triangles=faces, target_count=int(target_faces))
+        vertices, faces = _clean_faces(np.asarray(points, dtype=np.float64), np.asarray(triangles, dtype=np.int64))
+        if len(faces) <= target_faces * 1.1:
+            return vertices, faces
+        # Edge collapse stalls on noisy or non-manifold scans; clustering finishes the job
+    return cluster_decimate(vertices, faces, target_faces)
+
+
+def face_budget(lod, face_count):
+    budget = int(round(lod * face_count)) if lod <= 1 else int(lod)
+    return max(4, min(face_count, budget))
+
+
+# --- SINGLE FILE (worker entry point) ---
+def output_name(rel):
+    """a/model.stl -> a/model.stl.glb, so model.stl and model.glb next to each other don't collide."""
+    return rel + '.glb'
+
+
+def lod_path(output_path, level):
+    """model.glb, model.lod1.glb, model.lod2.glb, ..."""
+    if level == 0:
+        return output_path
+    stem, ext = os.path.splitext(output_path)
+    return f"{stem}.lod{level}{ext}"
+
+
+def _sha256(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_output(path, payload):
+    tmp_path = path + '.part'
+    with open(tmp_path, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+    return len(payload)
+
+
+def optimize_file(source_path, output_path, lods=DEFAULT_LODS, tolerance=WELD_TOLERANCE):
+    """Cleans, decimates and writes every LOD of one mesh. Returns its report entry."""
+    start = time.perf_counter()
+    loaded, parts = load_mesh(source_path)
+    faces_in = sum(len(part.faces) for part in parts)
+    if faces_in == 0:
+        raise ValueError("No triangles in mesh")
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+
+    textured = is_textured(parts)
+    if textured:
+        # Welding, decimation and quantization would strip the UVs/materials: keep LOD0 as is
+        if face_budget(lods[0], faces_in) < faces_in:
+            raise ValueError("Textured mesh can't be decimated without losing its UVs/materials; use LOD 1.0")
+        size = _write_output(output_path, loaded.export(file_type='glb'))
+        outputs = [{'path': output_path, 'faces': int(faces_in), 'bytes': size}]
+    else:
+        vertices, faces = weld(*mesh_arrays(loaded), tolerance)
+        cleaned = len(faces)
+        outputs = []
+        for level, lod in enumerate(lods):
+            # Each level starts from the previous one, so coarse LODs work on an already reduced mesh
+            vertices, faces = decimate(vertices, faces, face_budget(lod, cleaned))
+            path = lod_path(output_path, level)
+            size = _write_output(path, to_quantized_glb_bytes(vertices, faces))
+            outputs.append({'path': path, 'faces': int(len(faces)), 'bytes': size})
+
+    return {
+        'source': source_path,
+        'sha256': _sha256(source_path),
+        'facesIn': int(faces_in),
+        'bytesIn': os.path.getsize(source_path),
+        'textured': textured,
+        'outputs': outputs,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+# --- MANIFEST ---
+def load_manifest(out_dir):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(out_dir, manifest):
+    path = os.path.join(out_dir, MANIFEST_NAME)
+    with open(path + '.part', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    os.replace(path + '.part', path)
+
+
+def _is_current(entry, source_path, out_dir, settings, output):
+    """Unchanged since the last run: same settings and output name, outputs present, same mtime/size or hash."""
+    if not entry or entry.get('settings') != settings:
+        return False
+    if not entry.get('outputs') or entry['outputs'][0]['path'] != output:
+        return False
+    if not all(os.path.exists(os.path.join(out_dir, o['path'])) for o in entry.get('outputs', [])):
+        return False
+    st = os.stat(source_path)
+    if entry.get('mtime') == st.st_mtime and entry.get('bytesIn') == st.st_size:
+        return True
+    if entry.get('sha256') == _sha256(source_path):  # Touched but not modified
+        entry['mtime'] = st.st_mtime
+        return True
+    return False
+
+
+# --- BATCH ---
+def find_meshes(src_dir, out_dir):
+    out_dir = os.path.abspath(out_dir)
+    found = []
+    for dirpath, dirnames, filenames in os.walk(src_dir):
+        dirnames[:] = sorted(d for d in dirnames if os.path.abspath(os.path.join(dirpath, d)) != out_dir)
+        for name in sorted(filenames):
+            if name.lower().endswith(MESH_EXTENSIONS):
+                found.append(os.path.relpath(os.path.join(dirpath, name), src_dir))
+    return found
+
+
+def optimize_directory(src_dir, out_dir, lods=DEFAULT_LODS, workers=OPTIMIZER_WORKERS,
+                       tolerance=WELD_TOLERANCE, force=False):
+    """Optimizes every changed mesh under src_dir into out_dir. Returns (results, skipped)."""
+    if os.path.abspath(src_dir) == os.path.abspath(out_dir):
+        raise ValueError("Output directory must differ from the source directory")
+    os.makedirs(out_dir, exist_ok=True)
+    manifest = load_manifest(out_dir)
+    settings = {'lods': list(lods), 'tolerance': tolerance,
+                'decimator': 'qem' if qem_simplify is not None else 'cluster'}
+
+    pending, skipped = [], []
+    for rel in find_meshes(src_dir, out_dir):
+        if not force and _is_current(manifest.get(rel), os.path.join(src_dir, rel), out_dir, settings,
+                                     output_name(rel)):
+            skipped.append(rel)
+        else:
+            pending.append(rel)
+
+    results = []
+    if pending:
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(pending)))) as pool:
+            futures = {
+                pool.submit(optimize_file, os.path.join(src_dir, rel),
+                            os.path.join(out_dir, output_name(rel)), lods, tolerance): rel
+                for rel in pending
+            }
+            for future in as_completed(futures):
+                rel = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"⚠️ Optimizer Error ({rel}): {e}")
+                    continue
+                result.update(name=rel, settings=settings, mtime=os.stat(result.pop('source')).st_mtime)
+                for output in result['outputs']:
+                    output['path'] = os.path.relpath(output['path'], out_dir)  # Manifest moves with out_dir
+                manifest[rel] = result
+                save_manifest(out_dir, manifest)  # Progress survives an interrupted run
+                results.append(result)
+                print_result(result)
+
+    save_manifest(out_dir, manifest)
+    return results, skipped
+
+
+# --- REPORT ---
+def _mb(size):
+    return f"{size / (1024 * 1024):7.2f}MB"
+
+
+def print_result(result):
+    lod0 = result['outputs'][0]
+    faces = ' / '.join(str(o['faces']) for o in result['outputs'])
+    reduction = 100.0 * (1 - lod0['bytes'] / max(result['bytesIn'], 1))
+    note = " (textured: kept as is, no LODs)" if result.get('textured') else ""
+    print(f"✅ {result['name']}: {result['facesIn']} -> {faces} faces, "
+          f"{_mb(result['bytesIn'])} -> {_mb(lod0['bytes'])} ({reduction:5.1f}% smaller) in {result['seconds']:.2f}s{note}")
+
+
+def print_summary(results, skipped, wall):
+    bytes_in = sum(r['bytesIn'] for r in results)
+    bytes_out = sum(r['outputs'][0]['bytes'] for r in results)
+    lod_bytes = sum(o['bytes'] for r in results for o in r['outputs'])
+    print(f"Optimized {len(results)} file(s), skipped {len(skipped)} unchanged, wall {wall:.2f}s")
+    if results:
+        print(f"  LOD0 total  {_mb(bytes_in)} -> {_mb(bytes_out)} ({100.0 * (1 - bytes_out / max(bytes_in, 1)):.1f}% smaller)")
+        print(f"  all LODs    {_mb(lod_bytes)}")
+        print(f"  cpu time    {sum(r['seconds'] for r in results):.2f}s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Weld, decimate and quantize meshes into GLB LODs")
+    parser.add_argument('src', help="Directory to scan for STL/GLB/OBJ/PLY files")
+    parser.add_argument('out', help="Directory for the optimized GLBs and manifest.json")
+    parser.add_argument('--lod', type=float, action='append',
+                        help="LOD level: <= 1 is a fraction of the faces, > 1 a face budget (repeatable)")
+    parser.add_argument('--workers', type=int, default=OPTIMIZER_WORKERS)
+    parser.add_argument('--tolerance', type=float, default=WELD_TOLERANCE)
+    parser.add_argument('--force', action='store_true', help="Ignore the manifest and redo everything")
+    args = parser.parse_args(argv)
+    if qem_simplify is None:
+        print("⚠️ fast_simplification not installed, decimating with vertex clustering (pip install -r requirements.txt)")
+
+    start = time.perf_counter()
+    results, skipped = optimize_directory(args.src, args.out, tuple(args.lod or DEFAULT_LODS),
+                                          args.workers, args.tolerance, args.force)
+    print_summary(results, skipped, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import os
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from metrics import metrics
+
+# --- MESHY API CLIENT ---
+# One pooled, keep-alive session for every reconstruction, and exponential
+# backoff polling that can be cancelled between polls.
+
+MESHY_API_KEY = os.environ.get("MESHY_API_KEY")
+MESHY_API_URL = os.environ.get("MESHY_API_URL", "https://api.meshy.ai").rstrip('/')
+
+HTTP_POOL_SIZE = int(os.environ.get("MESHY_POOL_SIZE", 16))
+HTTP_TIMEOUT = (5, 30)  # (connect, read) seconds
+
+# Task options sent with every request (also part of the result cache key)
+MESHY_PARAMS = {
+    "mode": "preview",
+    "enable_pbr": True,
+    "should_remesh": True
+}
+
+POLL_INITIAL = 1.0
+POLL_FACTOR = 1.6
+POLL_MAX = 10.0
+POLL_DEADLINE = 180.0
+
+
+def make_session(pool_size=HTTP_POOL_SIZE):
+    """requests.Session with connection pooling and retries on transient GET failures."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504),
+                  allowed_methods=frozenset(['GET']))
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+http = make_session()
+
+
+def poll_delays(initial=POLL_INITIAL, factor=POLL_FACTOR, maximum=POLL_MAX, deadline=POLL_DEADLINE):
+    """Exponential backoff schedule, capped per step and in total."""
+    elapsed, delay = 0.0, initial
+    while elapsed < deadline:
+        yield delay
+        elapsed += delay
+        delay = min(delay * factor, maximum)
+
+
+def generate_mesh_with_api(image_urls, output_path, progress=None, cancel_event=None,
+                           session=None, api_key=None, base_url=None, delays=None):
+    """
+    Runs one Meshy image-to-3d task and downloads the GLB to output_path.
+    Returns a result code: SUCCESS, MISSING_KEY, OUT_OF_CREDITS, INVALID_KEY,
+    GENERATION_FAILED, CANCELLED, TIMEOUT or CRASH.
+    """
+    api_key = api_key or MESHY_API_KEY
+    session = session or http
+    base_url = (base_url or MESHY_API_URL).rstrip('/')
+    cancel_event = cancel_event or threading.Event()
+    progress = progress or (lambda step, fraction=None: None)
+
+    if not api_key:
+        print("❌ CRITICAL ERROR: MESHY_API_KEY is missing in Render Environment!")
+        return "MISSING_KEY"
+
+    headers = {'Authorization': f'Bearer {api_key}'}
+
+    payload = dict(MESHY_PARAMS, image_urls=image_urls[:4])
+
+    print(f"📡 API CALL: Sending {len(payload['image_urls'])} images to Meshy...")
+
+    try:
+        # STEP 1: CREATE TASK
+        with metrics.timer('meshy_stage_seconds', stage='upload'):
+            response = session.post(f"{base_url}/v1/image-to-3d", json=payload, headers=headers, timeout=HTTP_TIMEOUT)
+
+        if response.status_code == 402:
+            print("🚨 API ERROR: Payment Required. You are out of Meshy Credits.")
+            return "OUT_OF_CREDITS"
+
+        if response.status_code == 401:
+            print("🚨 API ERROR: Unauthorized. Check your API Key.")
+            return "INVALID_KEY"
+
+        response.raise_for_status()
+        task_id = response.json()['result']
+        print(f"✅ API SUCCESS: Task Started (ID: {task_id})")
+        progress('AI Generation in Progress...', 0.0)
+
+        # STEP 2: POLLING (exponential backoff, wakes early on cancel)
+        poll_start = time.perf_counter()
+        for delay in (delays if delays is not None else poll_delays()):
+            if cancel_event.wait(delay):
+                print(f"🛑 API CANCELLED: Task {task_id} abandoned")
+                return "CANCELLED"
+
+            with metrics.timer('meshy_request_seconds', call='status'):
+                status_res = session.get(f"{base_url}/v1/image-to-3d/{task_id}", headers=headers, timeout=HTTP_TIMEOUT)
+            status_data = status_res.json()
+            state = status_data.get('status')
+
+            if state in ('SUCCEEDED', 'FAILED'):
+                metrics.observe('meshy_stage_seconds', time.perf_counter() - poll_start, stage='poll')
+
+            if state == 'SUCCEEDED':
+                model_url = status_data['model_urls']['glb']
+                print(f"🎉 DOWNLOAD: Retrieving model from {model_url}")
+                progress('Downloading Mesh...', 1.0)
+                with metrics.timer('meshy_stage_seconds', stage='download'):
+                    download(session, model_url, output_path)
+                return "SUCCESS"
+
+            if state == 'FAILED':
+                error_msg = status_data.get('task_error', 'Unknown Error')
+                print(f"❌ API FAILED during generation. Reason: {error_msg}")
+                return "GENERATION_FAILED"
+
+            pct = status_data.get('progress')
+            if pct is not None:
+                progress(f'AI Generation in Progress... {int(pct)}%', pct / 100)
+
+    except Exception as e:
+        print(f"💥 UNEXPECTED CRASH: {e}")
+        return "CRASH"
+
+    return "TIMEOUT"
+
+
+def download(session, url, output_path, chunk_size=1 << 16):
+    """Streams a file to disk, only replacing output_path once it is complete."""
+    tmp_path = output_path + ".part"
+    with session.get(url, stream=True, timeout=HTTP_TIMEOUT) as res:
+        res.raise_for_status()
+        with open(tmp_path, 'wb') as f:
+            for chunk in res.iter_content(chunk_size):
+                f.write(chunk)
+    os.replace(tmp_path, output_path)
@@ -0,0 +1,171 @@
+import os
+import time
+import bisect
+import threading
+import functools
+from contextlib import contextmanager
+
+# --- METRICS (Latency Histograms + Counters) ---
+# In-process instrumentation for the socket handlers and the Meshy call path.
+# Timings go into fixed-bucket histograms (one bisect + two adds per sample),
+# counters are plain dict entries, and gauges are callbacks read at scrape time.
+# Everything is rendered as Prometheus text on /metrics.
+# METRICS_ENABLED=0 turns every hook into a no-op.
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") != "0"
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)  # Seconds
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def percentile(self, q):
+        """Estimate from the buckets (linear inside the bucket that holds the rank)."""
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lo = self.buckets[i - 1] if i > 0 else 0.0
+                hi = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lo + (hi - lo) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def _format_labels(key, extra=None):
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in pairs) + '}'
+
+
+class Metrics:
+    def __init__(self, enabled=METRICS_ENABLED, buckets=LATENCY_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._histograms = {}  # (name, labels) -> Histogram
+        self._counters = {}    # (name, labels) -> number
+        self._gauges = {}      # name -> callable
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    # --- RECORDING ---
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, seconds, **labels):
+        if not self.enabled:
+            return
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self.buckets)
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """with metrics.timer('stage_seconds', stage='upload'): ..."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def timed(self, name, **labels):
+        """Decorator: observes the call duration and counts exceptions in <name>_errors_total."""
+        errors = name.rsplit('_seconds', 1)[0] + '_errors_total'
+
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                except Exception:
+                    self.inc(errors, **labels)
+                    raise
+                finally:
+                    self.observe(name, time.perf_counter() - start, **labels)
+            return wrapper
+        return decorate
+
+    def gauge(self, name, fn):
+        """Registers a value read only when /metrics is scraped."""
+        self._gauges[name] = fn
+
+    # --- READING ---
+    def histogram(self, name, **labels):
+        with self._lock:
+            return self._histograms.get((name, _label_key(labels)))
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def render(self):
+        """Prometheus text exposition format."""
+        if not self.enabled:
+            return "# metrics disabled (METRICS_ENABLED=0)\n"
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+            snapshots = [(key, list(h.counts), h.sum, h.count, h.percentile(50), h.percentile(99))
+                         for key, h in histograms]
+
+        lines = [f"# uptime {time.time() - self.started_at:.0f}s"]
+        typed = set()
+        for (name, key), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(key)} {value}")
+
+        for name, fn in sorted(self._gauges.items()):
+            try:
+                value = fn()
+            except Exception:
+                continue
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+
+        for (name, key), counts, total, count, p50, p99 in snapshots:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, n in zip(list(self.buckets) + ['+Inf'], counts):
+                cumulative += n
+                lines.append(f"{name}_bucket{_format_labels(key, ('le', bound))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(key)} {total:.6f}")
+            lines.append(f"{name}_count{_format_labels(key)} {count}")
+            lines.append(f"# {name}{_format_labels(key)} p50={p50:.4f}s p99={p99:.4f}s")  # For humans
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
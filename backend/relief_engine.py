@@ -0,0 +1,185 @@
+import io
+import os
+import base64
+import numpy as np
+from PIL import Image
+from voxel_engine import stack_runs, rect_corners
+from mesh_export import open_writer
+
+# --- RELIEF ENGINE (WallArt) ---
+# Server-side port of src/utils/reliefEngine.ts (generateReliefGeometry).
+# Every pixel is a flat-topped column: brightness above the threshold sets its
+# height, darker pixels are holes. Instead of 2 top + 2 bottom + up to 8 wall
+# triangles per pixel, equal-height neighbours are merged into rectangles:
+#  - Top:    runs of equal height along x, stacked over consecutive rows
+#  - Bottom: runs of solid pixels, stacked the same way
+#  - Walls:  one quad per height step between neighbours, merged along the edge
+# Heights come from 8-bit luminance, so there are at most 256 distinct levels.
+# Rows are meshed in bands and streamed to the writer, keeping memory bounded.
+
+MAX_RELIEF_RES = int(os.environ.get("MAX_RELIEF_RES", 4096))
+MAX_RELIEF_TRIANGLES = int(os.environ.get("MAX_RELIEF_TRIANGLES", 4_000_000))
+BAND_PIXELS = 1 << 16  # Pixels meshed per chunk; bounds peak memory
+
+
+def decode_image(encoded):
+    """Base64 image (a data URL is fine) -> PIL image, flattened onto black like a canvas."""
+    if not encoded:
+        raise ValueError("An image is required")
+    if ',' in encoded[:100]:
+        encoded = encoded.split(',', 1)[1]
+    img = Image.open(io.BytesIO(base64.b64decode(encoded)))
+    img.load()
+    return img
+
+
+def _positive(config, key):
+    value = float(config[key])
+    if not (np.isfinite(value) and value > 0):
+        raise ValueError(f"{key} must be a positive number, got {config[key]!r}")
+    return value
+
+
+def grid_size(config):
+    """(cols, rows) exactly as the browser engine picks them, capped at MAX_RELIEF_RES."""
+    aspect = _positive(config, 'width') / _positive(config, 'height')
+    cols = int(_positive(config, 'detail'))
+    rows = int(round(cols / aspect))
+    if not (1 <= cols <= MAX_RELIEF_RES and 1 <= rows <= MAX_RELIEF_RES):
+        raise ValueError(f"Relief grid {cols}x{rows} must be within 1..{MAX_RELIEF_RES}")
+    return cols, rows
+
+
+def luminance(img, cols, rows, invert=False):
+    """uint8[rows, cols] brightness (0.299R + 0.587G + 0.114B) of the resized image."""
+    img.draft('RGB', (cols, rows))  # JPEG: let the decoder downscale first
+    if img.mode in ('RGBA', 'LA', 'P'):
+        rgba = img.convert('RGBA')
+        flat = Image.new('RGB', rgba.size, (0, 0, 0))  # Transparent pixels read as black
+        flat.paste(rgba, mask=rgba.getchannel('A'))
+        img = flat
+    gray = img.convert('RGB').resize((cols, rows), Image.BILINEAR).convert('L')
+    lum = np.asarray(gray, dtype=np.uint8)
+    return 255 - lum if invert else lum
+
+
+def height_levels(lum, config):
+    """
+    Per-pixel level index (0 = hole) plus the height of each level.
+    Levels are ranked distinct heights, so flat mode has a single level.
+    """
+    threshold = float(config['threshold'])
+    depth = float(config['depth'])
+    b = np.arange(256, dtype=np.float64)
+    if config.get('isFlat'):
+        heights = np.full(256, depth)
+    else:
+        heights = np.maximum(0.1, (b - threshold) / max(255.0 - threshold, 1.0) * depth)
+    heights[b < threshold] = 0.0
+
+    z_values, level_of = np.unique(np.append(heights, 0.0), return_inverse=True)
+    levels = level_of[:256].astype(np.uint16)[lum]
+    return levels, z_values
+
+
+def _value_runs(grid):
+    """Runs of equal non-zero values along x -> (row, start, stop, value), stop exclusive."""
+    padded = np.pad(grid, ((0, 0), (1, 1)))
+    row, col = np.nonzero(padded[:, 1:] != padded[:, :-1])
+    value = padded[row, col + 1]
+    starts = np.nonzero(value)[0]
+    # A run always closes at the next change in the same row (the pad guarantees one)
+    return row[starts], col[starts], col[starts + 1], value[starts]
+
+
+def _steps(near, far):
+    """Height steps between two neighbour strips -> (index, lo, hi, near_is_higher)."""
+    idx = np.nonzero(near != far)
+    lo = np.minimum(near[idx], far[idx])
+    hi = np.maximum(near[idx], far[idx])
+    return idx, lo, hi, near[idx] > far[idx]
+
+
+def _band_quads(padded, r0, r1, last):
+    """Integer (x, y, level) quads for image rows r0..r1 of the zero-padded level grid."""
+    band = padded[r0 + 1:r1 + 1, 1:-1]
+    quads = []
+
+    # Top faces, one plane per level
+    row, x0, x1, level = _value_runs(band)
+    s, y_lo, y_hi, x_lo, x_hi = stack_runs(level, row + r0, x0, x1)
+    quads.append(rect_corners(2, True, s, x_lo, x_hi, y_lo, y_hi))
+
+    # Bottom face on z = 0
+    row, x0, x1, _ = _value_runs((band > 0).astype(np.uint8))
+    s, y_lo, y_hi, x_lo, x_hi = stack_runs(np.zeros_like(row), row + r0, x0, x1)
+    quads.append(rect_corners(2, False, s, x_lo, x_hi, y_lo, y_hi))
+
+    # Walls between columns x-1 | x: faces +x where the left pixel is higher
+    rows = padded[r0 + 1:r1 + 1]
+    (row, x), lo, hi, left_high = _steps(rows[:, :-1], rows[:, 1:])
+    key, y_lo, y_hi, z_lo, z_hi = stack_runs(x * 2 + left_high, row + r0, lo, hi)
+    for positive in (True, False):
+        pick = key % 2 == int(positive)
+        quads.append(rect_corners(0, positive, key[pick] // 2, y_lo[pick], y_hi[pick],
+                                  z_lo[pick], z_hi[pick]))
+
+    # Walls between rows y-1 | y (the band owns the boundaries above its rows)
+    stop = r1 + 1 if last else r1
+    upper, lower = padded[r0:stop, 1:-1], padded[r0 + 1:stop + 1, 1:-1]
+    (row, x), lo, hi, up_high = _steps(upper, lower)
+    key, x_lo, x_hi, z_lo, z_hi = stack_runs((row + r0) * 2 + up_high, x, lo, hi)
+    for positive in (True, False):
+        pick = key % 2 == int(positive)
+        quads.append(rect_corners(1, positive, key[pick] // 2, x_lo[pick], x_hi[pick],
+                                  z_lo[pick], z_hi[pick]))
+
+    return np.concatenate(quads)
+
+
+def relief_chunks(levels, z_values, config, band_pixels=BAND_PIXELS):
+    """Yields (vertices float32, faces) per band of rows; vertices are shared within a band."""
+    rows, cols = levels.shape
+    width, height = float(config['width']), float(config['height'])
+    step_x, step_y = width / cols, height / rows
+    padded = np.pad(levels, 1)
+    n_levels = len(z_values)
+    band_rows = max(1, band_pixels // cols)
+    triangles = 0
+
+    for r0 in range(0, rows, band_rows):
+        r1 = min(r0 + band_rows, rows)
+        quads = _band_quads(padded, r0, r1, last=r1 == rows).astype(np.int64)
+        if not len(quads):
+            continue
+        # Noisy images defeat the merging; stop before the rest of the file gets written
+        triangles += 2 * len(quads)
+        if triangles > MAX_RELIEF_TRIANGLES:
+            raise ValueError(f"Relief would have over {MAX_RELIEF_TRIANGLES} triangles; lower detail")
+        keys = (quads[..., 1] * (cols + 1) + quads[..., 0]) * n_levels + quads[..., 2]
+        unique, inverse = np.unique(keys.ravel(), return_inverse=True)
+        corners = inverse.reshape(-1, 4)
+        # Image rows run down while y runs up: the flip mirrors the mesh, so wind the other way
+        faces = np.concatenate([corners[:, [0, 2, 1]], corners[:, [0, 3, 2]]])
+
+        level = unique % n_levels
+        cell = unique // n_levels
+        vertices = np.empty((len(unique), 3), dtype=np.float32)
+        vertices[:, 0] = (cell % (cols + 1)) * step_x - width / 2
+        vertices[:, 1] = height / 2 - (cell // (cols + 1)) * step_y
+        vertices[:, 2] = z_values[level]
+        yield vertices, faces
+
+
+def generate_relief(img, config, path, fmt='stl'):
+    """Meshes a PIL image straight to an STL/GLB file. Returns a small summary."""
+    cols, rows = grid_size(config)
+    lum = luminance(img, cols, rows, bool(config.get('invert')))
+    levels, z_values = height_levels(lum, config)
+
+    triangles = 0
+    with open_writer(path, fmt) as writer:
+        for vertices, faces in relief_chunks(levels, z_values, config):
+            writer.add(vertices, faces)
+            triangles += len(faces)
+    return {'cols': cols, 'rows': rows, 'triangles': triangles}
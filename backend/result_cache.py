@@ -0,0 +1,109 @@
+import os
+import json
+import shutil
+import hashlib
+import threading
+from cache_index import CacheIndex
+
+# --- RESULT CACHE (Content-Addressed) ---
+# Finished reconstructions keyed by sha256(selected frame bytes + Meshy params).
+# Blobs live in one shared store outside scans/<room>, are hard-linked into
+# sessions, and are evicted least-recently-used once over the byte budget.
+
+RESULT_CACHE_DIR = os.environ.get("RESULT_CACHE_DIR", "cache")
+RESULT_CACHE_BYTES = int(os.environ.get("RESULT_CACHE_BYTES", 512 * 1024 * 1024))
+BLOB_SUFFIX = '.glb'
+
+
+def _file_digest(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def cache_key(frame_paths, params):
+    """Order-independent over frames, sensitive to every request parameter."""
+    digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8'))
+    for frame_digest in sorted(_file_digest(p) for p in frame_paths):
+        digest.update(frame_digest.encode('ascii'))
+    return digest.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, root=RESULT_CACHE_DIR, budget_bytes=RESULT_CACHE_BYTES):
+        self.root = root
+        self.index = CacheIndex(budget_bytes)
+        os.makedirs(root, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        """Rebuild the LRU order from disk, using mtime as last use."""
+        blobs = []
+        for name in os.listdir(self.root):
+            if name.endswith(BLOB_SUFFIX):
+                st = os.stat(os.path.join(self.root, name))
+                blobs.append((st.st_mtime, name[:-len(BLOB_SUFFIX)], st.st_size))
+        self.index.load(blobs)
+
+    def _blob_path(self, key):
+        return os.path.join(self.root, key + BLOB_SUFFIX)
+
+    def get(self, key):
+        """Blob path on a hit (and marks it recently used), else None."""
+        if not self.index.hit(key):
+            return None
+        path = self._blob_path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            self.index.discard(key)
+            return None
+        return path
+
+    def put(self, key, source_path):
+        """Adds a finished result (linked, not copied, when on the same disk)."""
+        path = self._blob_path(key)
+        if not (os.path.exists(path) and os.path.samefile(source_path, path)):
+            tmp_path = f"{path}.{threading.get_ident()}.part"
+            _link_or_copy(source_path, tmp_path)
+            os.replace(tmp_path, path)
+        for victim in self.index.add(key, os.path.getsize(path)):
+            try:
+                os.remove(self._blob_path(victim))
+            except FileNotFoundError:
+                pass
+        return path
+
+    def materialize(self, key, dest_path):
+        """Places a cached result at dest_path. Returns False on a miss."""
+        path = self.get(key)
+        if path is None:
+            return False
+        tmp_path = f"{dest_path}.{threading.get_ident()}.part"
+        try:
+            if os.path.exists(dest_path) and os.path.samefile(path, dest_path):
+                return True  # Already linked (rename() between links of one inode is a no-op)
+            _link_or_copy(path, tmp_path)
+            os.replace(tmp_path, dest_path)
+        except OSError as e:
+            # Evicted or removed since get(): carry on as a miss
+            print(f"⚠️ Result Cache Error ({key[:12]}): {e}")
+            self.index.discard(key)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+        return True
+
+    def stats(self):
+        return self.index.stats()
+
+
+def _link_or_copy(source, dest):
+    try:
+        if os.path.exists(dest):
+            os.remove(dest)
+        os.link(source, dest)
+    except OSError:
+        shutil.copyfile(source, dest)
@@ -0,0 +1,336 @@
+import eventlet
+eventlet.monkey_patch()  # Green sockets/threads for the Meshy client and job workers
+from eventlet import tpool
+
+import os
+import base64
+import tempfile
+from collections import defaultdict
+from flask import Flask, jsonify, send_from_directory, request, Response
+from flask_cors import CORS
+from flask_socketio import SocketIO, emit, join_room
+from voxel_engine import decode_mask, generate_voxel_mesh, MAX_GRID
+from mesh_export import export_mesh
+from relief_engine import decode_image, generate_relief
+from geo_engine import TileCache, GeoFetchError, geo_request, fetch_source, model_glb
+from frame_store import FrameStore
+from jobs import JobScheduler, QueueFull
+from meshy_client import generate_mesh_with_api, MESHY_PARAMS
+from result_cache import ResultCache, cache_key
+from storage_manager import StorageManager
+from keyframes import FeatureCache, select_keyframes
+from metrics import metrics
+
+# --- CONFIGURATION ---
+BACKEND_PUBLIC_URL = os.environ.get("RENDER_EXTERNAL_URL", "https://replicator-backend.onrender.com")
+
+# 1. SETUP
+app = Flask(__name__)
+CORS(app)
+socketio = SocketIO(app, cors_allowed_origins="*")
+
+UPLOAD_FOLDER = 'scans'
+if not os.path.exists(UPLOAD_FOLDER):
+    os.makedirs(UPLOAD_FOLDER)
+
+feature_cache = FeatureCache()
+result_cache = ResultCache()
+geo_cache = TileCache(offload=tpool.execute)
+frame_store = FrameStore(
+    UPLOAD_FOLDER,
+    on_saved=lambda room, filename: feature_cache.warm(os.path.join(UPLOAD_FOLDER, room), filename),
+    offload=tpool.execute,
+)
+
+# Which sockets sit in which room, so work can be dropped once a room empties
+room_members = defaultdict(set)
+
+def push_job_status(job):
+    """Mirrors job progress onto the existing processing_status event."""
+    if job.status in ('succeeded', 'cancelled'):
+        return  # model_ready already went out / nobody left to tell
+    socketio.emit('processing_status', {'step': job.step, 'jobId': job.id, 'progress': job.progress}, room=job.key)
+
+scheduler = JobScheduler(spawn=socketio.start_background_task, on_update=push_job_status)
+
+# --- JANITOR (Cleanup) ---
+# TTL + disk quota, swept on a background task; rmtree runs on a native thread
+storage = StorageManager(
+    UPLOAD_FOLDER,
+    spawn=socketio.start_background_task,
+    offload=tpool.execute,
+    is_busy=lambda room: room in room_members,
+    on_evict=frame_store.forget,
+)
+
+# --- METRICS ---
+# Gauges are read when /metrics is scraped, so they cost nothing in between
+metrics.gauge('active_rooms', lambda: len(room_members))
+metrics.gauge('connected_sockets', lambda: len(set().union(*room_members.values())))
+metrics.gauge('jobs_queued', lambda: scheduler.stats()['queued'])
+metrics.gauge('jobs_running', lambda: scheduler.stats()['running'])
+metrics.gauge('storage_bytes', lambda: storage.stats()['bytes'])
+metrics.gauge('geo_cache_bytes', lambda: geo_cache.stats()['bytes'])
+
+# --- ROUTES ---
+@app.route('/')
+@app.route('/health')
+@app.route('/ping') # The fix for your 404 error
+def health_check():
+    return "Replicator Engine Online", 200
+
+@app.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/files/<room_id>/<filename>')
+def serve_file(room_id, filename):
+    path = os.path.join(UPLOAD_FOLDER, room_id)
+    return send_from_directory(path, filename)
+
+@app.route('/thumbs/<room_id>/<filename>')
+def serve_thumbnail(room_id, filename):
+    thumb_path = frame_store.thumbnail_path(room_id, os.path.basename(filename))
+    if thumb_path is None:
+        return jsonify({'error': 'Frame not found'}), 404
+    return send_from_directory(os.path.abspath(os.path.dirname(thumb_path)), os.path.basename(thumb_path))
+
+@app.route('/storage')
+def storage_stats():
+    return jsonify(storage.stats())
+
+@app.route('/cache')
+def cache_stats():
+    return jsonify(result_cache.stats())
+
+@app.route('/geo/cache')
+def geo_cache_stats():
+    return jsonify(geo_cache.stats())
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = scheduler.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/voxelize', methods=['POST'])
+def voxelize():
+    """Intersection engine: two base64 masks in, binary STL/GLB out."""
+    data = request.get_json(silent=True) or {}
+    try:
+        size = int(data.get('gridSize', 100))
+        if not 1 <= size <= MAX_GRID:
+            return jsonify({'error': f'gridSize must be between 1 and {MAX_GRID}'}), 400
+        mask_a = decode_mask(data.get('maskA'), size)
+        mask_b = decode_mask(data.get('maskB'), size)
+        if mask_a is None and mask_b is None:
+            return jsonify({'error': 'At least one mask is required'}), 400
+
+        # Meshing and export run on a native thread so sockets keep flowing meanwhile
+        vertices, faces = tpool.execute(
+            generate_voxel_mesh, mask_a, mask_b, size,
+            artistic_mode=bool(data.get('artisticMode', False)),
+            smoothing_iterations=int(data.get('smoothingIterations', 0)),
+            target_height_cm=float(data.get('targetHeightCM', 10)),
+        )
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    payload, mimetype = tpool.execute(export_mesh, vertices, faces, data.get('format', 'stl'))
+    print(f"🧊 Voxelize: {size}^3 grid -> {len(faces)} triangles")
+    return Response(payload, mimetype=mimetype)
+
+@app.route('/relief', methods=['POST'])
+def relief():
+    """WallArt engine: base64 image + ReliefConfig in, binary STL/GLB streamed out."""
+    data = request.get_json(silent=True) or {}
+    fmt = 'glb' if data.get('format') == 'glb' else 'stl'
+    fd, path = tempfile.mkstemp(suffix='.' + fmt, prefix='relief-')
+    os.close(fd)
+    try:
+        img = decode_image(data.get('image'))
+        config = {key: data[key] for key in ('width', 'height', 'depth', 'threshold', 'detail') if key in data}
+        config.update(invert=bool(data.get('invert', False)), isFlat=bool(data.get('isFlat', False)))
+        # Meshing is pure NumPy on a native thread, so sockets keep flowing meanwhile
+        info = tpool.execute(generate_relief, img, config, path, fmt)
+    except (ValueError, TypeError, KeyError, OSError) as e:
+        os.remove(path)
+        return jsonify({'error': f"Invalid relief request: {e}"}), 400
+
+    def stream(chunk_size=1 << 20):
+        try:
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(chunk_size), b''):
+                    yield chunk
+        finally:
+            os.remove(path)
+
+    print(f"🖼️ Relief: {info['cols']}x{info['rows']} grid -> {info['triangles']} triangles")
+    mimetype = 'model/gltf-binary' if fmt == 'glb' else 'model/stl'
+    return Response(stream(), mimetype=mimetype, headers={'Content-Length': str(os.path.getsize(path))})
+
+@app.route('/geo', methods=['POST'])
+def geo():
+    """GeoSculptor: lat/lon + city radius or terrain zoom in, one merged GLB (with baseplate) out."""
+    data = request.get_json(silent=True) or {}
+    try:
+        params = geo_request(data)
+    except (ValueError, TypeError, KeyError) as e:
+        return jsonify({'error': f"Invalid geo request: {e}"}), 400
+
+    try:
+        # Tiles and Overpass answers come from the disk cache when possible; downloads stay
+        # green, decoding and cache files run on native threads
+        with metrics.timer('geo_stage_seconds', stage='fetch', mode=params['mode']):
+            source, cached = fetch_source(params, geo_cache, offload=tpool.execute)
+    except GeoFetchError as e:
+        metrics.inc('geo_requests_total', result='UPSTREAM_ERROR')
+        print(f"⚠️ Geo fetch failed: {e}")
+        return jsonify({'error': str(e)}), 502
+    metrics.inc('geo_cache_total', result='hit' if cached else 'miss', mode=params['mode'])
+
+    with metrics.timer('geo_stage_seconds', stage='mesh', mode=params['mode']):
+        payload, info = tpool.execute(model_glb, params, source)
+    metrics.inc('geo_requests_total', result='SUCCESS')
+    print(f"🗺️ Geo {info['mode']}: {info['triangles']} triangles, {len(payload) // 1024} KB "
+          f"({'cached' if cached else 'fetched'})")
+    return Response(payload, mimetype='model/gltf-binary')
+
+# --- SOCKETS ---
+@socketio.on('join_session')
+@metrics.timed('socket_handler_seconds', event='join_session')
+def handle_join(data):
+    storage.start()  # No-op once running; servers without app.py's __main__ block (gunicorn) start it here
+    room = data.get('sessionId')
+    device_type = data.get('type')
+    if room:
+        join_room(room)
+        room_members[room].add(request.sid)
+        print(f"🔵 Socket: Device ({device_type}) joined {room}")
+        if device_type == 'sensor':
+            emit('session_status', {'status': 'connected'}, room=room)
+
+@socketio.on('disconnect')
+@metrics.timed('socket_handler_seconds', event='disconnect')
+def handle_disconnect(reason=None):
+    for room in [r for r, sids in room_members.items() if request.sid in sids]:
+        room_members[room].discard(request.sid)
+        if not room_members[room]:
+            del room_members[room]
+            cancelled = scheduler.cancel_key(room)
+            if cancelled:
+                print(f"🛑 Room {room} is empty, cancelled {cancelled} job(s)")
+
+def ingest_frame(room, jpeg_bytes):
+    """Queue the write, then send the desktop metadata + a thumbnail link instead of the image."""
+    try:
+        with metrics.timer('frame_stage_seconds', stage='ingest'):
+            meta = frame_store.ingest(room, jpeg_bytes)
+        storage.touch(room)
+        metrics.inc('frames_total')
+        metrics.inc('frame_bytes_total', meta['size'])
+        print(f"📸 Image Saved. Count: {meta['count']}")
+        emit('frame_received', {'thumbnail': f"/thumbs/{room}/{meta['filename']}", **meta}, room=room, include_self=False)
+    except Exception as e:
+        metrics.inc('frame_errors_total')
+        print(f"⚠️ Image Save Error: {e}")
+
+@socketio.on('send_frame_binary')
+@metrics.timed('socket_handler_seconds', event='send_frame_binary')
+def handle_frame_binary(data):
+    room = data.get('roomId')
+    image_data = data.get('image')
+    if room and image_data:
+        ingest_frame(room, bytes(image_data))
+
+@socketio.on('send_frame')
+@metrics.timed('socket_handler_seconds', event='send_frame')
+def handle_frame(data):
+    """Legacy base64 data-URL event, kept for older sensor clients."""
+    room = data.get('roomId')
+    image_data = data.get('image')
+    if room and image_data:
+        try:
+            with metrics.timer('frame_stage_seconds', stage='decode'):
+                header, encoded = image_data.split(",", 1)
+                file_data = base64.b64decode(encoded)
+        except Exception as e:
+            metrics.inc('frame_errors_total')
+            print(f"⚠️ Image Save Error: {e}")
+            return
+        ingest_frame(room, file_data)
+
+@socketio.on('process_3d')
+@metrics.timed('socket_handler_seconds', event='process_3d')
+def handle_process(data):
+    room = data.get('sessionId')
+    if room:
+        storage.touch(room)
+        emit('processing_status', {'step': 'Uploading to Neural Cloud...'}, room=room)
+        session_path = os.path.join(UPLOAD_FOLDER, room)
+        
+        if not os.path.exists(session_path):
+             emit('processing_status', {'step': 'Error: No scans found'}, room=room)
+             return
+
+        frame_store.flush(room)
+        local_files = frame_store.filenames(room)
+        if len(local_files) < 1:
+            emit('processing_status', {'step': 'Error: Need at least 1 photo'}, room=room)
+            return
+
+        # Smart Selection: sharp, well-exposed, diverse views (features cached at ingest)
+        with metrics.timer('process_stage_seconds', stage='keyframes'):
+            features = feature_cache.ensure(session_path, local_files)
+            selected_files = select_keyframes(local_files, [features[f] for f in local_files], count=4)
+        if not selected_files:
+            emit('processing_status', {'step': 'Error: No usable photos'}, room=room)
+            return
+
+        image_urls = [f"{BACKEND_PUBLIC_URL}/files/{room}/{f}" for f in selected_files]
+        output_filename = "reconstruction.glb"
+        output_path = os.path.join(session_path, output_filename)
+
+        # Same frames + same parameters -> reuse the earlier result, no API credits
+        with metrics.timer('process_stage_seconds', stage='cache_lookup'):
+            key = cache_key([os.path.join(session_path, f) for f in selected_files], MESHY_PARAMS)
+            hit = result_cache.materialize(key, output_path)
+        if hit:
+            metrics.inc('reconstructions_total', result='CACHE_HIT')
+            storage.touch(room)
+            print(f"♻️ Cache Hit: {key[:12]} -> {room}")
+            emit('model_ready', {'url': output_filename, 'cached': True}, room=room)
+            return
+
+        try:
+            job = scheduler.submit(room, run_reconstruction, image_urls, output_path, key)
+        except QueueFull:
+            metrics.inc('reconstructions_total', result='QUEUE_FULL')
+            emit('processing_status', {'step': 'Error: Server busy, try again shortly'}, room=room)
+            return
+        emit('processing_status', {'step': 'Queued for AI Generation...', 'jobId': job.id}, room=room)
+
+def run_reconstruction(job, image_urls, output_path, result_key):
+    """Job body: runs on a scheduler worker, reports back through the room."""
+    room = job.key
+    metrics.observe('meshy_stage_seconds', job.started_at - job.created_at, stage='queue')
+    result_code = generate_mesh_with_api(image_urls, output_path, progress=job.report, cancel_event=job.cancel_event)
+    metrics.inc('reconstructions_total', result=result_code)
+
+    if result_code == "SUCCESS":
+        storage.touch(room)
+        try:
+            result_cache.put(result_key, output_path)
+        except OSError as e:
+            print(f"⚠️ Cache Warning: Could not store result. Reason: {e}")
+        socketio.emit('model_ready', {'url': os.path.basename(output_path), 'jobId': job.id}, room=room)
+    elif result_code == "CANCELLED":
+        pass  # Nobody left in the room to tell
+    elif result_code == "OUT_OF_CREDITS":
+        job.report('Error: Meshy AI Credits Exhausted')
+    elif result_code == "INVALID_KEY":
+        job.report('Error: Invalid API Key')
+    else:
+        job.report(f'Failed: {result_code}')
+    return result_code
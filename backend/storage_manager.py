@@ -0,0 +1,162 @@
+import os
+import time
+import heapq
+import shutil
+import threading
+from cache_index import dir_size
+
+# --- STORAGE MANAGER (Background Janitor) ---
+# Replaces the per-join directory sweep. Session activity is tracked in memory
+# (a heap ordered by last activity) and a background task evicts sessions that
+# are past their TTL, or the oldest ones while scans/ is over its disk quota.
+# Sizes are measured, never summed from events: each sweep re-walks the
+# sessions touched since the last one (frames, thumbs/, features/, models)
+# and sets their size, so files replaced in place are not counted twice.
+
+SESSION_TTL = int(os.environ.get("SESSION_TTL", 3600))
+STORAGE_QUOTA_BYTES = int(os.environ.get("STORAGE_QUOTA_BYTES", 2 * 1024 * 1024 * 1024))
+SWEEP_INTERVAL = int(os.environ.get("STORAGE_SWEEP_INTERVAL", 60))
+EVICT_BATCH = 16
+
+
+class StorageManager:
+    def __init__(self, root, ttl=SESSION_TTL, quota_bytes=STORAGE_QUOTA_BYTES,
+                 interval=SWEEP_INTERVAL, spawn=None, offload=None, is_busy=None, on_evict=None):
+        self.root = root
+        self.ttl = ttl
+        self.quota_bytes = quota_bytes
+        self.interval = interval
+        self._spawn = spawn or (lambda fn: threading.Thread(target=fn, daemon=True).start())
+        self._offload = offload or (lambda fn, *args: fn(*args))  # Blocking disk work goes here
+        self._is_busy = is_busy or (lambda room: False)
+        self._on_evict = on_evict or (lambda room: None)
+        self._sessions = {}  # room -> [last_activity, bytes]
+        self._heap = []      # (last_activity, room); stale entries are skipped lazily
+        self._dirty = set()  # Rooms touched since their size was last measured
+        self._bytes = 0
+        self._evicted = 0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started = False
+
+    # --- ACTIVITY (called from socket handlers, memory only) ---
+    def touch(self, room):
+        """Marks activity; the room's size is re-measured on the next sweep."""
+        now = time.time()
+        with self._lock:
+            entry = self._sessions.setdefault(room, [now, 0])
+            entry[0] = now
+            self._dirty.add(room)
+            heapq.heappush(self._heap, (now, room))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'sessions': len(self._sessions),
+                'bytes': self._bytes,
+                'quotaBytes': self.quota_bytes,
+                'ttl': self.ttl,
+                'evicted': self._evicted,
+            }
+
+    # --- BACKGROUND LOOP ---
+    def start(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self._spawn(self._run)
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        self._seed(self._offload(self._scan))
+        while not self._stop.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"⚠️ Janitor Warning: Could not clean storage. Reason: {e}")
+            self._stop.wait(self.interval)
+
+    def _scan(self):
+        """One walk at start-up (off the event loop) for sessions left by a previous run."""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path):
+                found.append((name, os.path.getmtime(path), dir_size(path)))
+        return found
+
+    def _seed(self, found):
+        with self._lock:
+            for name, mtime, size in found:
+                if name not in self._sessions:
+                    self._sessions[name] = [mtime, 0]
+                    heapq.heappush(self._heap, (mtime, name))
+                self._set_size_locked(name, size)  # Sessions active since boot keep their activity
+
+    def _set_size_locked(self, room, size):
+        entry = self._sessions.get(room)
+        if entry is not None:
+            self._bytes += size - entry[1]
+            entry[1] = size
+
+    def _measure(self, rooms):
+        return {room: dir_size(os.path.join(self.root, room)) for room in rooms}
+
+    def refresh(self):
+        """Re-measures the sessions touched since the last sweep (the walk runs off the event loop)."""
+        with self._lock:
+            dirty, self._dirty = self._dirty, set()
+        if not dirty:
+            return
+        sizes = self._offload(self._measure, dirty)
+        with self._lock:
+            for room, size in sizes.items():
+                self._set_size_locked(room, size)
+
+    def sweep(self):
+        """Evicts expired sessions, then the oldest ones while over quota, in batches."""
+        self.refresh()
+        while True:
+            victims = self._pick_victims(EVICT_BATCH)
+            if not victims:
+                return
+            self._offload(self._delete, victims)
+            for room in victims:
+                self._on_evict(room)
+
+    def _pick_victims(self, limit):
+        now = time.time()
+        victims, busy = [], []
+        with self._lock:
+            projected = self._bytes
+            while self._heap and len(victims) < limit:
+                last, room = self._heap[0]
+                entry = self._sessions.get(room)
+                if entry is None or entry[0] != last:
+                    heapq.heappop(self._heap)  # Stale: session touched again or gone
+                    continue
+                if now - last <= self.ttl and projected <= self.quota_bytes:
+                    break
+                heapq.heappop(self._heap)
+                if self._is_busy(room):
+                    busy.append((now, room))
+                    entry[0] = now
+                    continue
+                victims.append(room)
+                projected -= entry[1]
+                self._bytes -= entry[1]
+                del self._sessions[room]
+            for item in busy:
+                heapq.heappush(self._heap, item)
+            self._evicted += len(victims)
+        return victims
+
+    def _delete(self, rooms):
+        for room in rooms:
+            print(f"🧹 Janitor: Deleting old session {room}")
+            shutil.rmtree(os.path.join(self.root, room), ignore_errors=True)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+import trimesh
+from fake_geo import overpass_city
+from geo_engine import (BOX_LIMIT, building_bbox, clip_rings, ear_clip_rings, extrude_buildings,
+                        overpass_elements, parse_buildings)
+
+# Invariants of the vectorised footprint pipeline (clip, ear clip, extrude).
+# Many rings are processed in one batch, so a slip in the per-ring index
+# arithmetic shows up as wrong counts or areas rather than a crash.
+# Run with: python -m pytest backend
+
+
+def _star_rings(rng, count, max_points=24):
+    """Counter-clockwise star-shaped rings (often concave), points grouped by ring."""
+    xy, ring = [], []
+    for r in range(count):
+        n = rng.integers(3, max_points + 1)
+        # Jittered but ordered angles with every gap under pi, so the ring stays simple
+        angle = (np.arange(n) + rng.uniform(0, 0.4, n)) * (2 * np.pi / n)
+        radius = rng.uniform(0.05, 1.0, n)  # Deep notches: reflex corners near other ears
+        centre = rng.uniform(-10, 10, 2)
+        xy.append(centre + np.stack([np.cos(angle), np.sin(angle)], axis=1) * radius[:, None])
+        ring.append(np.full(n, r))
+    return np.concatenate(xy), np.concatenate(ring)
+
+
+def _ring_areas(xy, ring, count):
+    """Shoelace area per ring (0 for rings with no points)."""
+    areas = np.zeros(count)
+    for r in range(count):
+        p = xy[ring == r]
+        q = np.roll(p, -1, axis=0)
+        areas[r] = (p[:, 0] * q[:, 1] - p[:, 1] * q[:, 0]).sum() / 2
+    return areas
+
+
+def _triangle_areas(xy, triangles):
+    a, b, c = xy[triangles[:, 0]], xy[triangles[:, 1]], xy[triangles[:, 2]]
+    return ((b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])) / 2
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_ear_clipping_covers_each_ring_exactly(seed):
+    rng = np.random.default_rng(seed)
+    count = 40
+    xy, ring = _star_rings(rng, count)
+    triangles = ear_clip_rings(xy, ring, count)
+
+    owner = ring[triangles[:, 0]]
+    assert (ring[triangles] == owner[:, None]).all()  # Triangles never mix rings
+    assert np.array_equal(np.bincount(owner, minlength=count), np.bincount(ring, minlength=count) - 2)
+    area = _triangle_areas(xy, triangles)
+    assert (area >= -1e-9).all()
+    assert np.bincount(owner, weights=area, minlength=count) == pytest.approx(_ring_areas(xy, ring, count))
+
+
+def test_clip_rings_keeps_the_part_inside_the_box():
+    # Square straddling the +x edge, square fully inside, square fully outside
+    square = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float64)
+    xy = np.concatenate([square * 20 + [BOX_LIMIT - 5, 0], square * 10, square * 10 + [2 * BOX_LIMIT, 0]])
+    ring = np.repeat(np.arange(3), 4)
+
+    clipped, clipped_ring = clip_rings(xy, ring, 3)
+    assert (np.abs(clipped) <= BOX_LIMIT + 1e-9).all()
+    assert np.array_equal(np.unique(clipped_ring), [0, 1])
+    assert _ring_areas(clipped, clipped_ring, 3) == pytest.approx([5 * 20, 100, 0])
+
+
+def _city(radius_km, lat=48.1374, lon=11.5755):
+    text = overpass_city(*building_bbox(lat, lon, radius_km))
+    return parse_buildings(text['elements'])
+
+
+@pytest.mark.parametrize('radius_km', [0.1, 0.3])
+def test_extruded_buildings_are_watertight(radius_km):
+    buildings = _city(radius_km)
+    vertices, faces = extrude_buildings(buildings, 48.1374, 11.5755, radius_km)
+    assert len(faces)
+
+    # Buildings share no vertices, so every edge must pair up within one solid
+    mesh = trimesh.Trimesh(vertices, faces, process=False)
+    assert mesh.is_watertight
+    assert mesh.is_winding_consistent
+    assert mesh.volume > 0
+    assert (np.abs(vertices[:, [0, 2]]) <= BOX_LIMIT + 1e-3).all()
+
+
+def test_overpass_elements_matches_json_loads():
+    import json
+    text = json.dumps(overpass_city(48.13, 11.57, 48.132, 11.573), indent=1)
+    assert list(overpass_elements(text)) == json.loads(text)['elements']
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+from voxel_engine import build_voxels, extract_quads, quads_to_mesh, stack_runs
+
+# Invariants of the greedy mesher: whatever the run/pair index arithmetic does,
+# the merged surface must enclose exactly the voxels of the dense volume.
+# Run with: python -m pytest backend
+
+
+def _volume(vertices, faces):
+    """Signed volume by the divergence theorem; positive for outward winding."""
+    tri = vertices[faces]
+    return np.einsum('ij,ij->i', tri[:, 0], np.cross(tri[:, 1], tri[:, 2])).sum() / 6.0
+
+
+def _area(vertices, faces):
+    tri = vertices[faces]
+    return np.linalg.norm(np.cross(tri[:, 1] - tri[:, 0], tri[:, 2] - tri[:, 0]), axis=1).sum() / 2.0
+
+
+def _masks(kind, size, rng):
+    if kind == 'random':
+        return rng.random((size, size)) < 0.6, rng.random((size, size)) < 0.6
+    if kind == 'stripes':
+        stripes = np.zeros((size, size), dtype=bool)
+        stripes[:, ::2] = True
+        return stripes, stripes.T.copy()
+    if kind == 'layers':
+        # Identical rows in blocks, so wall pairs span multi-layer groups
+        rows = np.repeat(rng.random((size // 4, size)) < 0.5, 4, axis=0)
+        return rows, rows[:, ::-1].copy()
+    return None, rng.random((size, size)) < 0.5
+
+
+@pytest.mark.parametrize('kind', ['random', 'stripes', 'layers', 'solid_a'])
+def test_separable_mesh_encloses_dense_volume(kind):
+    size = 24
+    mask_a, mask_b = _masks(kind, size, np.random.default_rng(7))
+    voxels = build_voxels(mask_a, mask_b, size)
+
+    vertices, faces = quads_to_mesh(extract_quads(mask_a, mask_b, size), size)
+    assert _volume(vertices, faces) == pytest.approx(voxels.sum())
+
+    # Same surface as the unmerged neighbour-diff faces of the dense volume
+    dense_vertices, dense_faces = quads_to_mesh(extract_quads(mask_a, mask_b, size, merge=False), size)
+    assert _area(vertices, faces) == pytest.approx(_area(dense_vertices, dense_faces))
+
+
+def test_artistic_mesh_encloses_eroded_volume():
+    size = 20
+    mask_a, mask_b = _masks('random', size, np.random.default_rng(3))
+    voxels = build_voxels(mask_a, mask_b, size, artistic_mode=True)
+    vertices, faces = quads_to_mesh(extract_quads(mask_a, mask_b, size, artistic_mode=True), size)
+    assert _volume(vertices, faces) == pytest.approx(voxels.sum())
+
+
+def test_stack_runs_merges_consecutive_and_multi_row_runs():
+    s = np.array([0, 0, 0, 0, 1])
+    u = np.array([0, 1, 4, 6, 0])
+    u_end = np.array([1, 4, 5, 7, 1])  # Rows 0..5 touch, row 6 starts after a gap
+    v0 = np.array([2, 2, 2, 2, 2])
+    v1 = np.array([5, 5, 5, 5, 5])
+    rects = np.stack(stack_runs(s, u, v0, v1, u_end), axis=1)
+    assert rects.tolist() == [[0, 0, 5, 2, 5], [0, 6, 7, 2, 5], [1, 0, 1, 2, 5]]
@@ -0,0 +1,285 @@
+import os
+import base64
+import numpy as np
+from scipy import sparse
+
+# --- DUAL-SILHOUETTE VOXEL ENGINE ---
+# Server-side port of src/utils/voxelEngine.ts (generateVoxelGeometry).
+# Masks come in image layout: mask[imgY, x] == True where the silhouette is dark.
+#  - MaskA: Front view (looking along Z) -> voxel (x, y)
+#  - MaskB: Side view  (looking along X) -> voxel (z, y)
+# A voxel is solid only if BOTH views say so, which is an outer product per row.
+
+MAX_GRID = 512
+MAX_DENSE_GRID = int(os.environ.get("MAX_DENSE_GRID", 256))  # Artistic / smoothing build the full volume
+MAX_SMOOTHING = 20
+MAX_VOXEL_TRIANGLES = int(os.environ.get("MAX_VOXEL_TRIANGLES", 4_000_000))
+SMOOTH_LAMBDA = 0.6
+
+
+def _check_budget(quads):
+    """Refuses meshes over the triangle budget before their corner arrays get allocated."""
+    if 2 * quads > MAX_VOXEL_TRIANGLES:
+        raise ValueError(f"Mesh would have over {MAX_VOXEL_TRIANGLES} triangles; lower gridSize")
+
+
+def decode_mask(encoded, size):
+    """Base64 of size*size bytes (row-major, non-zero = solid) -> bool[size, size]."""
+    if encoded is None:
+        return None
+    raw = np.frombuffer(base64.b64decode(encoded), dtype=np.uint8)
+    if raw.size != size * size:
+        raise ValueError(f"Mask has {raw.size} cells, expected {size * size}")
+    return raw.reshape(size, size) != 0
+
+
+def _oriented_masks(mask_a, mask_b, size):
+    """Flip image rows so y grows upwards, then transpose to (x, y) / (z, y)."""
+    full = np.ones((size, size), dtype=bool)
+    a = full if mask_a is None else np.asarray(mask_a, dtype=bool)[::-1, :].T
+    b = full if mask_b is None else np.asarray(mask_b, dtype=bool)[::-1, :].T
+    return np.ascontiguousarray(a), np.ascontiguousarray(b)
+
+
+def build_voxels(mask_a, mask_b, size, artistic_mode=False):
+    """bool[x, y, z] occupancy grid from the two silhouettes (None = fully solid)."""
+    a, b = _oriented_masks(mask_a, mask_b, size)
+    voxels = a[:, :, None] & b.T[None, :, :]
+
+    if artistic_mode:
+        # Same hash-noise erosion as the browser engine, one x-slab at a time
+        # so the float temporaries stay 2D.
+        scale = 0.08
+        y = np.arange(size)[:, None] * (78.233 * scale)
+        z = np.arange(size)[None, :] * (37.719 * scale)
+        yz = y + z
+        for x in range(size):
+            if not a[x].any():
+                continue
+            n = np.abs(np.sin(x * 12.9898 * scale + yz) * 43758.5453) % 1
+            voxels[x] &= n >= 0.4
+
+    return voxels
+
+
+# --- RUNS & RECTANGLES ---
+def _runs(rows):
+    """Runs of True along the last axis of a 2D mask -> (row, start, stop), stop exclusive."""
+    step = np.diff(rows.astype(np.int8), axis=1, prepend=0, append=0)
+    row, start = np.nonzero(step == 1)
+    _, stop = np.nonzero(step == -1)
+    return row, start, stop
+
+
+def stack_runs(s, u, v0, v1, u_end=None):
+    """
+    Greedy merge of identical (s, v0, v1) runs sitting on consecutive u rows.
+    A run may already cover rows u..u_end (exclusive); by default it is one row.
+    Returns rectangles (s, u_lo, u_hi, v0, v1) with u_hi exclusive.
+    """
+    if u_end is None:
+        u_end = u + 1
+    if len(s) == 0:
+        return s, u, u_end, v0, v1
+    order = np.lexsort((u, v1, v0, s))
+    s, u, u_end, v0, v1 = s[order], u[order], u_end[order], v0[order], v1[order]
+
+    new_rect = np.ones(len(s), dtype=bool)
+    new_rect[1:] = (
+        (s[1:] != s[:-1]) | (v0[1:] != v0[:-1]) |
+        (v1[1:] != v1[:-1]) | (u[1:] != u_end[:-1])
+    )
+    starts = np.nonzero(new_rect)[0]
+    ends = np.append(starts[1:] - 1, len(s) - 1)
+    return s[starts], u[starts], u_end[ends], v0[starts], v1[starts]
+
+
+def _pair_runs(runs_a, runs_b, n_rows, quads_per_pair=1):
+    """Cartesian product of two run lists, row by row -> (row, a_idx, b_idx)."""
+    row_a, row_b = runs_a[0], runs_b[0]
+    count_b = np.bincount(row_b, minlength=n_rows)
+    first_b = np.concatenate([[0], np.cumsum(count_b)[:-1]])
+
+    reps = count_b[row_a]
+    _check_budget(int(reps.sum()) * quads_per_pair)
+    a_idx = np.repeat(np.arange(len(row_a)), reps)
+    group_start = np.repeat(np.cumsum(reps) - reps, reps)
+    b_idx = first_b[row_a[a_idx]] + (np.arange(len(a_idx)) - group_start)
+    return row_a[a_idx], a_idx, b_idx
+
+
+def rect_corners(axis, positive, plane, u_lo, u_hi, v_lo, v_hi):
+    """
+    Outward-wound corners for axis-aligned rectangles. (u, v) are the two
+    remaining axes in increasing order; hi bounds are exclusive.
+    """
+    others = [d for d in range(3) if d != axis]
+    corners = np.empty((len(plane), 4, 3), dtype=np.int32)
+    corners[:, :, axis] = np.asarray(plane)[:, None]
+    corners[:, :, others[0]] = np.stack([u_lo, u_hi, u_hi, u_lo], axis=1)
+    corners[:, :, others[1]] = np.stack([v_lo, v_lo, v_hi, v_hi], axis=1)
+    # e_u x e_v points along +axis for x/z planes and -axis for the y plane
+    if (axis != 1) != positive:
+        corners = corners[:, ::-1]
+    return corners
+
+
+# --- FACE EXTRACTION (Separable fast path) ---
+def _separable_quads(a, b, size):
+    """
+    Merged quads straight from the silhouettes, without building the volume.
+    Layer y is the box product A_y x B_y, so every exposed face is a product
+    of 1D runs: side walls sit on the run ends of one mask and span the runs
+    of the other, caps are the set difference with the neighbouring layer.
+    Walls are only paired up on layers where A or B changes; the layers
+    after it repeat the same walls, so each pair spans the whole group.
+    """
+    rows_a = a.T  # (y, x)
+    rows_b = b.T  # (y, z)
+    change = np.ones(size, dtype=bool)
+    change[1:] = (rows_a[1:] != rows_a[:-1]).any(axis=1) | (rows_b[1:] != rows_b[:-1]).any(axis=1)
+    group_lo = np.nonzero(change)[0]
+    group_hi = np.append(group_lo[1:], size)
+    runs_a = _runs(rows_a[group_lo])
+    runs_b = _runs(rows_b[group_lo])
+    g, ia, ib = _pair_runs(runs_a, runs_b, len(group_lo), quads_per_pair=4)
+    y, y_end = group_lo[g], group_hi[g]
+
+    quads = []
+    for positive in (True, False):
+        # +/-X walls: plane at an x run end, spanning a z run
+        x_plane = (runs_a[2] if positive else runs_a[1])[ia]
+        p, y_lo, y_hi, z_lo, z_hi = stack_runs(x_plane, y, runs_b[1][ib], runs_b[2][ib], y_end)
+        quads.append(rect_corners(0, positive, p, y_lo, y_hi, z_lo, z_hi))
+
+        # +/-Z walls: plane at a z run end, spanning an x run
+        z_plane = (runs_b[2] if positive else runs_b[1])[ib]
+        p, y_lo, y_hi, x_lo, x_hi = stack_runs(z_plane, y, runs_a[1][ia], runs_a[2][ia], y_end)
+        quads.append(rect_corners(2, positive, p, x_lo, x_hi, y_lo, y_hi))
+
+        # +/-Y caps: A_y x B_y minus the neighbouring layer, split into
+        # (A \ A') x B  and  (A & A') x (B \ B')
+        next_a = np.zeros_like(rows_a)
+        next_b = np.zeros_like(rows_b)
+        if positive:
+            next_a[:-1], next_b[:-1] = rows_a[1:], rows_b[1:]
+        else:
+            next_a[1:], next_b[1:] = rows_a[:-1], rows_b[:-1]
+        for part_a, part_b in ((rows_a & ~next_a, rows_b), (rows_a & next_a, rows_b & ~next_b)):
+            ra, rb = _runs(part_a), _runs(part_b)
+            cy, ca, cb = _pair_runs(ra, rb, size)
+            plane = cy + 1 if positive else cy
+            quads.append(rect_corners(1, positive, plane, ra[1][ca], ra[2][ca], rb[1][cb], rb[2][cb]))
+
+    return np.concatenate(quads)
+
+
+# --- FACE EXTRACTION (Generic volume path) ---
+def _volume_quads(voxels, merge):
+    """Neighbour-diff faces of an arbitrary occupancy grid, optionally run-merged."""
+    quads = []
+    total = 0
+    for axis in range(3):
+        # Normal axis first, contiguous so the diffs below stay cheap
+        vol = np.ascontiguousarray(np.moveaxis(voxels, axis, 0))
+        n = vol.shape[0]
+        for positive in (True, False):
+            faces = vol.copy()
+            if positive:
+                faces[:-1] &= ~vol[1:]
+            else:
+                faces[1:] &= ~vol[:-1]
+
+            if merge:
+                row, v_lo, v_hi = _runs(faces.reshape(n * vol.shape[1], -1))
+                s, u = np.divmod(row, vol.shape[1])
+                s, u_lo, u_hi, v_lo, v_hi = stack_runs(s, u, v_lo, v_hi)
+            else:
+                _check_budget(total + int(np.count_nonzero(faces)))
+                s, u_lo, v_lo = np.nonzero(faces)
+                u_hi, v_hi = u_lo + 1, v_lo + 1
+
+            total += len(s)
+            _check_budget(total)
+            plane = s + 1 if positive else s
+            quads.append(rect_corners(axis, positive, plane, u_lo, u_hi, v_lo, v_hi))
+
+    return np.concatenate(quads)
+
+
+def extract_quads(mask_a, mask_b, size, artistic_mode=False, merge=True):
+    """(Q, 4, 3) integer corner coordinates of every exposed, outward-wound quad."""
+    if merge and not artistic_mode:
+        a, b = _oriented_masks(mask_a, mask_b, size)
+        return _separable_quads(a, b, size)
+    voxels = build_voxels(mask_a, mask_b, size, artistic_mode)
+    return _volume_quads(voxels, merge)
+
+
+def quads_to_mesh(quads, size):
+    """Weld shared corners and split every quad into two triangles."""
+    flat = quads.reshape(-1, 3).astype(np.int64)
+    stride = size + 1
+    keys = (flat[:, 0] * stride + flat[:, 1]) * stride + flat[:, 2]
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+
+    vertices = np.empty((len(unique_keys), 3), dtype=np.float64)
+    vertices[:, 2] = unique_keys % stride
+    vertices[:, 1] = (unique_keys // stride) % stride
+    vertices[:, 0] = unique_keys // (stride * stride)
+
+    idx = inverse.reshape(-1, 4)
+    faces = np.concatenate([idx[:, [0, 1, 2]], idx[:, [0, 2, 3]]])
+    return vertices, faces
+
+
+# --- SMOOTHING (Sparse Laplacian) ---
+def laplacian_smooth(vertices, faces, iterations, lam=SMOOTH_LAMBDA):
+    """Uniform Laplacian smoothing, one sparse mat-vec per iteration."""
+    n = len(vertices)
+    edges = np.concatenate([faces[:, [0, 1]], faces[:, [1, 2]], faces[:, [2, 0]]])
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+    adjacency = sparse.coo_matrix((np.ones(len(rows)), (rows, cols)), shape=(n, n)).tocsr()
+    adjacency.data[:] = 1.0  # duplicate edges collapse to a single neighbour
+
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    degree[degree == 0] = 1.0
+    averaging = sparse.diags(1.0 / degree) @ adjacency
+
+    positions = vertices.copy()
+    for _ in range(iterations):
+        positions += lam * (averaging @ positions - positions)
+    return positions
+
+
+# --- PIPELINE ---
+def generate_voxel_mesh(mask_a, mask_b, size, artistic_mode=False,
+                        smoothing_iterations=0, target_height_cm=10):
+    """
+    Full pipeline: voxels -> faces -> mesh, centred and scaled to the target
+    height in millimetres. Smoothing needs a uniform vertex lattice, so quads
+    are only merged when smoothing is off.
+    """
+    if not 1 <= size <= MAX_GRID:
+        raise ValueError(f"Grid size must be between 1 and {MAX_GRID}")
+    if (artistic_mode or smoothing_iterations > 0) and size > MAX_DENSE_GRID:
+        raise ValueError(f"Artistic mode and smoothing need gridSize <= {MAX_DENSE_GRID}")
+    if smoothing_iterations > MAX_SMOOTHING:
+        raise ValueError(f"smoothingIterations must be at most {MAX_SMOOTHING}")
+
+    quads = extract_quads(mask_a, mask_b, size, artistic_mode, merge=smoothing_iterations <= 0)
+    vertices, faces = quads_to_mesh(quads, size)
+    if len(faces) == 0:
+        return vertices, faces
+
+    if smoothing_iterations > 0:
+        vertices = laplacian_smooth(vertices, faces, smoothing_iterations)
+
+    lo, hi = vertices.min(axis=0), vertices.max(axis=0)
+    vertices -= (lo + hi) / 2
+    height = hi[1] - lo[1]
+    if height > 0.1:
+        vertices *= (target_height_cm * 10) / height
+
+    return vertices, faces
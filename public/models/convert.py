@@ -1,17 +1,23 @@
-import trimesh
+import os
 import sys
+import trimesh
+
+# Single-file converter (see convert_command.txt). GLB output now goes through
+# the batch optimizer in backend/mesh_optimizer.py: welded, optionally
+# decimated and quantized. For whole directories, LODs and skip-if-unchanged:
+#   python backend/mesh_optimizer.py <src_dir> <out_dir> --lod 1.0 --lod 0.25
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'backend'))
+from mesh_optimizer import optimize_file
 
-def convert(input_file, output_file):
-    # Load the STL
-    mesh = trimesh.load(input_file)
-    
-    # Optional: Simplify the mesh (Decimate) to 10% for web speed
-    # factor = 0.1
-    # mesh = mesh.simplify_quadratic_decimation(int(len(mesh.faces) * factor))
-    
-    # Export as GLB
-    mesh.export(output_file)
+def convert(input_file, output_file, factor=1.0):
+    if not output_file.lower().endswith('.glb'):
+        # Other formats: plain trimesh conversion, as before
+        trimesh.load(input_file).export(output_file)
+    else:
+        # factor < 1 decimates, e.g. 0.1 keeps 10% of the faces for web speed
+        result = optimize_file(input_file, output_file, lods=(factor,))
+        print(f"{result['facesIn']} -> {result['outputs'][0]['faces']} faces in {result['seconds']}s")
     print(f"Successfully converted {input_file} to {output_file}")
 
 if __name__ == "__main__":
-    convert(sys.argv[1], sys.argv[2])
\ No newline at end of file
+    convert(sys.argv[1], sys.argv[2], float(sys.argv[3]) if len(sys.argv) > 3 else 1.0)
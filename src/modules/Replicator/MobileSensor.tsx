@@ -66,11 +66,14 @@ export default function MobileSensor() {
             // 2. Draw current video frame to canvas
             ctx.drawImage(video, 0, 0, canvas.width, canvas.height);
             
-            // 3. Convert to JPG Base64 String (0.7 quality for speed)
-            const imageData = canvas.toDataURL("image/jpeg", 0.7);
-            
-            // 4. Send to Desktop
-            socket.emit('send_frame', { roomId: id, image: imageData });
+            // 3. Encode as raw JPEG bytes (0.7 quality for speed, no base64 overhead)
+            canvas.toBlob(async (blob) => {
+                if (!blob) return;
+                const buffer = await blob.arrayBuffer();
+
+                // 4. Send to Desktop (binary Socket.IO attachment)
+                socket.emit('send_frame_binary', { roomId: id, image: buffer });
+            }, "image/jpeg", 0.7);
             
             // 5. Visual Flash Effect
             video.style.opacity = "0";
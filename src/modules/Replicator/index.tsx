@@ -55,7 +55,8 @@ export default function Replicator() {
     });
 
     socket.on('frame_received', (data) => {
-        setFrames(prev => [...prev, data.image]);
+        // Server sends metadata + a thumbnail link; legacy payloads carry the image itself
+        setFrames(prev => [...prev, data.image ?? `${BACKEND_URL}${data.thumbnail}`]);
     });
 
     socket.on('processing_status', (data) => {